@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+
+# add the repository root to PATH, so that the package will be found
+root_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(root_dir)
+
+from s2sphere import CellId, LatLng
+
+from pgoapi.cells import CELL_LEVEL, MAX_CELLS_PER_REQUEST, cover_circle, chunk_cells
+from pgoapi.grid import DEFAULT_SCAN_RADIUS, plan_circle, circle_coverage
+from pgoapi.utilities import distance
+
+def hilbert_walk(lat, lng, count):
+    # the cell selection pokecli used before pgoapi.cells: count cells along the Hilbert curve around the origin
+    origin = CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).parent(CELL_LEVEL)
+    walk = [origin.id()]
+    right = origin.next()
+    left = origin.prev()
+    while len(walk) < count:
+        walk.append(right.id())
+        walk.append(left.id())
+        right = right.next()
+        left = left.prev()
+    return sorted(walk[:count])
+
+def square_spiral(lat, lng, step_size, count):
+    # the scan positions of the former generate_spiral example, without its random jitter
+    coords = [(lat, lng)]
+    x, y, d, m = 0, 0, 1, 1
+    while len(coords) < count:
+        while 2 * x * d < m and len(coords) < count:
+            x += d
+            coords.append((lat + x * step_size, lng + y * step_size))
+        while 2 * y * d < m and len(coords) < count:
+            y += d
+            coords.append((lat + x * step_size, lng + y * step_size))
+        d = -d
+        m += 1
+    return coords
+
+def compare_scan(lat, lng, radius, scan_radius):
+    plan = plan_circle(lat, lng, radius, scan_radius)
+    # the spiral gets the same number of positions
+    spiral = square_spiral(lat, lng, 0.0015, len(plan))
+    return {
+        'radius': radius,
+        'points': len(plan),
+        'coverage': plan.coverage,
+        'overlap': plan.overlap,
+        'distance': plan.distance,
+        'spiral_coverage': circle_coverage(spiral, lat, lng, radius, scan_radius),
+        'spiral_distance': sum(distance(a[0], a[1], b[0], b[1]) for a, b in zip(spiral, spiral[1:])),
+    }
+
+def compare(lat, lng, radius):
+    covering = cover_circle(lat, lng, radius)
+    # the legacy walk gets the same number of cells, so the difference is only in where they are
+    walk = hilbert_walk(lat, lng, len(covering))
+    inside = set(covering)
+
+    return {
+        'radius': radius,
+        'area_km2': math.pi * radius ** 2 / 1e6,
+        'cells': len(covering),
+        'rpcs': len(chunk_cells(covering)),
+        'walk_cells_inside': len(inside.intersection(walk)),
+        'walk_cells_outside': len(set(walk) - inside),
+        'walk_missed': len(inside - set(walk)),
+    }
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Cells, requests and scan positions needed to cover an area, compared to the former Hilbert walk and square spiral')
+    parser.add_argument("-l", "--location", default="40.7128,-74.0060", help="Center as lat,lng")
+    parser.add_argument("-r", "--radius", default="100,200,500,1000,2000,5000", help="Comma separated radii in metres")
+    parser.add_argument("-s", "--scan-radius", type=float, default=DEFAULT_SCAN_RADIUS, help="Visibility radius of a scan position in metres")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+def main():
+    config = init_config()
+    lat, lng = [float(x) for x in config.location.split(',')]
+
+    print('Cells per GET_MAP_OBJECTS request: {}'.format(MAX_CELLS_PER_REQUEST))
+    print('{0:>8} {1:>10} {2:>8} {3:>6} {4:>14} {5:>15} {6:>13}'.format(
+        '[radius]', '[area km2]', '[cells]', '[rpcs]', '[walk inside]', '[walk outside]', '[walk missed]'))
+    results = []
+    radii = [float(r) for r in config.radius.split(',')]
+    for radius in radii:
+        result = compare(lat, lng, radius)
+        results.append(result)
+        print('{radius:>8.0f} {area_km2:>10.2f} {cells:>8} {rpcs:>6} {walk_cells_inside:>14} {walk_cells_outside:>15} {walk_missed:>13}'.format(**result))
+
+    print('')
+    print('Scan positions with a visibility radius of {:.0f}m'.format(config.scan_radius))
+    print('{0:>8} {1:>8} {2:>10} {3:>9} {4:>12} {5:>17} {6:>17}'.format(
+        '[radius]', '[points]', '[coverage]', '[overlap]', '[distance m]', '[spiral coverage]', '[spiral distance]'))
+    scans = []
+    for radius in radii:
+        scan = compare_scan(lat, lng, radius, config.scan_radius)
+        scans.append(scan)
+        print('{radius:>8.0f} {points:>8} {coverage:>10.4f} {overlap:>9.2f} {distance:>12.0f} {spiral_coverage:>17.4f} {spiral_distance:>17.0f}'.format(**scan))
+
+    if config.output:
+        with open(config.output, 'w') as f:
+            json.dump({'cells': results, 'scans': scans}, f, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import threading
+import multiprocessing
+
+# add the repository root to PATH, so that the package will be found
+root_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(root_dir)
+
+from pgoapi import PGoApi
+from pgoapi.world import SyntheticWorld
+from pgoapi.standin import StandInServer, StandInAuth
+
+from pgoapi.cells import get_cell_ids
+from pgoapi.mapsync import MapSync, scan_cells
+
+log = logging.getLogger(__name__)
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Load test of PGoApi clients against a local stand-in server')
+    parser.add_argument("-n", "--accounts", default="1,2,4,8", help="Comma separated numbers of simulated accounts to run (default: 1,2,4,8)")
+    parser.add_argument("-t", "--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("-m", "--mix", default="map=8,inventory=1,encounter=1", help="Weights of the request types map, inventory and encounter")
+    parser.add_argument("-l", "--location", default="40.7128,-74.0060", help="Center of the scanned area as lat,lng")
+    parser.add_argument("-r", "--radius", type=float, default=2000, help="Radius of the scanned area in metres")
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Seed of the synthetic world")
+    parser.add_argument("--sync", help="Incremental map scans with per-cell since_timestamp_ms (MapSync)", action='store_true')
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    return parser.parse_args()
+
+def run_server(seed, address_queue, stop_event):
+    # the server runs in its own process, so it does not compete with the clients for the GIL
+    server = StandInServer(SyntheticWorld(seed=seed).handle)
+    server.start()
+    address_queue.put(server.url)
+    stop_event.wait()
+    server.stop()
+
+def parse_mix(mix):
+    weights = []
+    for part in mix.split(','):
+        name, weight = part.split('=')
+        if name not in OPERATIONS:
+            raise ValueError('Unknown request type in mix: {} (available: {})'.format(name, ', '.join(OPERATIONS)))
+        weights.append((name, float(weight)))
+    return weights
+
+def random_position(rnd, lat, lng, radius):
+    # uniform over the disk
+    r = radius * math.sqrt(rnd.random())
+    angle = rnd.uniform(0, 2 * math.pi)
+    return (lat + r * math.cos(angle) / 111320.0,
+            lng + r * math.sin(angle) / (111320.0 * math.cos(math.radians(lat))))
+
+def op_map(client, rnd):
+    lat, lng = random_position(rnd, client['lat'], client['lng'], client['radius'])
+    cell_ids = get_cell_ids(lat, lng)
+    sync = client['sync']
+    if sync is not None:
+        response = sync.scan(client['api'], lat, lng, cell_ids)
+    else:
+        response = scan_cells(client['api'], lat, lng, cell_ids)
+
+    if response:
+        for map_cell in response['responses']['GET_MAP_OBJECTS'].get('map_cells', []):
+            for pokemon in map_cell.get('wild_pokemons', []):
+                client['encounters'].append((pokemon['encounter_id'], pokemon['spawnpoint_id'], lat, lng))
+        del client['encounters'][:-100]
+    return response
+
+def op_inventory(client, rnd):
+    return client['api'].batch().get_inventory().execute()
+
+def op_encounter(client, rnd):
+    if client['encounters']:
+        encounter_id, spawnpoint_id, lat, lng = client['encounters'].pop()
+    else:
+        encounter_id, spawnpoint_id, lat, lng = rnd.getrandbits(64), '0', client['lat'], client['lng']
+    return client['api'].batch(lat, lng, 0).encounter(encounter_id=encounter_id, spawnpoint_id=spawnpoint_id,
+                                                      player_latitude=lat, player_longitude=lng).execute()
+
+OPERATIONS = {'map': op_map, 'inventory': op_inventory, 'encounter': op_encounter}
+
+def login_clients(count, url, lat, lng, radius, sync=False):
+    clients = []
+    for i in range(count):
+        api = PGoApi()
+        api.set_api_endpoint(url)
+        api.set_position(lat, lng, 0)
+        if not api.login(StandInAuth(), 'loadtest{}'.format(i), 'password'):
+            raise RuntimeError('Login of simulated account {} failed'.format(i))
+        clients.append({'api': api, 'lat': lat, 'lng': lng, 'radius': radius, 'encounters': [],
+                        'sync': MapSync() if sync else None})
+    return clients
+
+def worker(client, mix, deadline, seed, samples):
+    rnd = random.Random(seed)
+    names = [name for name, weight in mix]
+    total = sum(weight for name, weight in mix)
+    cumulative = []
+    acc = 0
+    for name, weight in mix:
+        acc += weight / total
+        cumulative.append(acc)
+
+    while time.time() < deadline:
+        x = rnd.random()
+        name = names[next((i for i, c in enumerate(cumulative) if x <= c), len(names) - 1)]
+        started = time.time()
+        response = OPERATIONS[name](client, rnd)
+        samples.append((name, time.time() - started, bool(response)))
+
+def percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(math.ceil(p / 100.0 * len(values))) - 1)]
+
+def summarize(samples, elapsed, cpu):
+    latencies = [s[1] for s in samples]
+    result = {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if not s[2]),
+        'throughput': len(samples) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'cpu_ms_per_request': cpu * 1000 / len(samples) if samples else 0,
+        'operations': {},
+    }
+    for name in set(s[0] for s in samples):
+        op_latencies = [s[1] for s in samples if s[0] == name]
+        result['operations'][name] = {
+            'requests': len(op_latencies),
+            'p50_ms': percentile(op_latencies, 50) * 1000,
+            'p99_ms': percentile(op_latencies, 99) * 1000,
+        }
+    return result
+
+def run_step(count, config, url, lat, lng, mix):
+    clients = login_clients(count, url, lat, lng, config.radius, config.sync)
+
+    samples = []
+    deadline = time.time() + config.duration
+    threads = [threading.Thread(target=worker, args=(client, mix, deadline, config.seed * 1000 + i, samples))
+               for i, client in enumerate(clients)]
+
+    cpu_started = os.times()
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+    cpu_times = os.times()
+    cpu = (cpu_times[0] - cpu_started[0]) + (cpu_times[1] - cpu_started[1])
+
+    return summarize(samples, elapsed, cpu)
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    lat, lng = [float(x) for x in config.location.split(',')]
+    mix = parse_mix(config.mix)
+    steps = [int(n) for n in config.accounts.split(',')]
+
+    address_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    server = multiprocessing.Process(target=run_server, args=(config.seed, address_queue, stop_event))
+    server.daemon = True
+    server.start()
+    url = address_queue.get(timeout=30)
+
+    results = []
+    print('{0:>9} {1:>10} {2:>8} {3:>12} {4:>10} {5:>10} {6:>12}'.format(
+        '[accounts]', '[requests]', '[errors]', '[requests/s]', '[p50 ms]', '[p99 ms]', '[cpu ms/req]'))
+    try:
+        for count in steps:
+            result = run_step(count, config, url, lat, lng, mix)
+            result['accounts'] = count
+            results.append(result)
+            print('{0:>9} {1:>10} {2:>8} {3:>12.1f} {4:>10.1f} {5:>10.1f} {6:>12.2f}'.format(
+                count, result['requests'], result['errors'], result['throughput'], result['p50_ms'], result['p99_ms'], result['cpu_ms_per_request']))
+    finally:
+        stop_event.set()
+        server.join(5)
+
+    if config.output:
+        with open(config.output, 'w') as f:
+            json.dump({'mix': dict(mix), 'duration': config.duration, 'sync': config.sync, 'steps': results}, f, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
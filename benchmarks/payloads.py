@@ -0,0 +1,123 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import random
+
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Responses_pb2 import GetInventoryResponse, GetMapObjectsResponse
+
+# Deterministic synthetic payloads for the benchmarks, sized like the
+# responses of a well played account and a busy city scan.
+
+def inventory_response(pokemon=250, items=20, families=100, seed=1):
+    rnd = random.Random(seed)
+    response = GetInventoryResponse()
+    response.success = True
+    delta = response.inventory_delta
+    delta.new_timestamp_ms = 1469000000000
+
+    for i in range(pokemon):
+        data = delta.inventory_items.add().inventory_item_data.pokemon_data
+        data.id = rnd.getrandbits(63)
+        data.pokemon_id = rnd.randint(1, 151)
+        data.cp = rnd.randint(10, 2000)
+        data.stamina = data.stamina_max = rnd.randint(10, 150)
+        data.move_1 = rnd.randint(200, 240)
+        data.move_2 = rnd.randint(13, 130)
+        data.height_m = rnd.uniform(0.2, 2.0)
+        data.weight_kg = rnd.uniform(1.0, 100.0)
+        data.individual_attack = rnd.randint(0, 15)
+        data.individual_defense = rnd.randint(0, 15)
+        data.individual_stamina = rnd.randint(0, 15)
+        data.pokeball = 1
+        data.captured_cell_id = rnd.getrandbits(63)
+        data.creation_time_ms = 1469000000000 - rnd.randint(0, 10 ** 9)
+
+    for i in range(items):
+        item = delta.inventory_items.add().inventory_item_data.item
+        item.item_id = i + 1
+        item.count = rnd.randint(1, 100)
+
+    for i in range(families):
+        family = delta.inventory_items.add().inventory_item_data.pokemon_family
+        family.family_id = i + 1
+        family.candy = rnd.randint(0, 300)
+
+    return response
+
+def map_objects_response(cells=21, forts=4, spawn_points=10, pokemon=5, seed=1):
+    rnd = random.Random(seed)
+    response = GetMapObjectsResponse()
+    response.status = 1
+
+    for c in range(cells):
+        cell = response.map_cells.add()
+        cell.s2_cell_id = 0x89c25a0000000000 + (c << 41)
+        cell.current_timestamp_ms = 1469000000000
+
+        for i in range(forts):
+            fort = cell.forts.add()
+            fort.id = '%032x.16' % rnd.getrandbits(128)
+            fort.last_modified_timestamp_ms = 1469000000000
+            fort.latitude = 40.7 + rnd.random() / 100
+            fort.longitude = -74.0 + rnd.random() / 100
+            fort.enabled = True
+            fort.type = rnd.randint(0, 1)
+
+        for i in range(spawn_points):
+            spawn_point = cell.spawn_points.add()
+            spawn_point.latitude = 40.7 + rnd.random() / 100
+            spawn_point.longitude = -74.0 + rnd.random() / 100
+
+        for i in range(pokemon):
+            wild = cell.wild_pokemons.add()
+            wild.encounter_id = rnd.getrandbits(63)
+            wild.last_modified_timestamp_ms = 1469000000000
+            wild.latitude = 40.7 + rnd.random() / 100
+            wild.longitude = -74.0 + rnd.random() / 100
+            wild.spawnpoint_id = '%011x' % rnd.getrandbits(44)
+            wild.pokemon_data.pokemon_id = rnd.randint(1, 151)
+            wild.time_till_hidden_ms = rnd.randint(0, 900000)
+
+            catchable = cell.catchable_pokemons.add()
+            catchable.spawnpoint_id = wild.spawnpoint_id
+            catchable.encounter_id = wild.encounter_id
+            catchable.pokemon_id = wild.pokemon_data.pokemon_id
+            catchable.expiration_timestamp_ms = 1469000000000 + wild.time_till_hidden_ms
+            catchable.latitude = wild.latitude
+            catchable.longitude = wild.longitude
+
+            nearby = cell.nearby_pokemons.add()
+            nearby.pokemon_id = rnd.randint(1, 151)
+            nearby.distance_in_meters = rnd.uniform(0, 200)
+
+    return response
+
+def response_envelope(*subresponses):
+    envelope = ResponseEnvelope()
+    envelope.status_code = 1
+    envelope.request_id = 8145806132888207460
+    envelope.returns.extend(subresponse.SerializeToString() for subresponse in subresponses)
+    return envelope.SerializeToString()
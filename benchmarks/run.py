@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import logging
+import argparse
+import platform
+
+from timeit import default_timer
+
+# add the repository root to PATH, so that the package will be found
+root_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(root_dir)
+
+from pgoapi import MetricsRegistry
+from pgoapi.auth import Auth
+from pgoapi.rpc_api import RpcApi
+from pgoapi.utilities import f2i
+from pgoapi.protobuf_to_dict import protobuf_to_dict
+
+from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+import payloads
+
+log = logging.getLogger(__name__)
+
+BENCHMARKS = []
+
+def benchmark(name):
+    """Registers a setup function which returns the callable to be measured."""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class DummyAuth(Auth):
+
+    def __init__(self):
+        Auth.__init__(self)
+        self._auth_provider = 'ptc'
+        self._auth_token = 'dummy'
+        self._login = True
+
+
+class DummyResponse:
+
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+
+
+LOGIN_REQUESTS = [
+    RequestType.Value('GET_PLAYER'),
+    RequestType.Value('GET_HATCHED_EGGS'),
+    RequestType.Value('GET_INVENTORY'),
+    RequestType.Value('CHECK_AWARDED_BADGES'),
+    {RequestType.Value('DOWNLOAD_SETTINGS'): {'hash': '05daf51635c82611d1aac95c0b051d3ec088a930'}},
+]
+
+def map_objects_request(lat=40.7128, lng=-74.0060):
+    from pgoapi.cells import get_cell_ids
+    cell_ids = get_cell_ids(lat, lng)
+    return [{RequestType.Value('GET_MAP_OBJECTS'): {
+        'latitude': f2i(lat), 'longitude': f2i(lng),
+        'since_timestamp_ms': [0] * len(cell_ids), 'cell_id': cell_ids}}]
+
+@benchmark('build_main_request.login')
+def bench_build_login():
+    rpc = RpcApi(DummyAuth())
+    position = (f2i(40.7128), f2i(-74.0060), f2i(0))
+    return lambda: rpc._build_main_request(LOGIN_REQUESTS, position)
+
+@benchmark('build_main_request.get_map_objects')
+def bench_build_map_objects():
+    rpc = RpcApi(DummyAuth())
+    subrequests = map_objects_request()
+    position = (f2i(40.7128), f2i(-74.0060), f2i(0))
+    return lambda: rpc._build_main_request(subrequests, position)
+
+@benchmark('build_sub_requests.get_map_objects')
+def bench_build_sub_requests():
+    rpc = RpcApi(DummyAuth())
+    subrequests = map_objects_request()
+    return lambda: rpc._build_sub_requests(RequestEnvelope(), subrequests)
+
+@benchmark('serialize_request.get_map_objects')
+def bench_serialize_request():
+    rpc = RpcApi(DummyAuth())
+    request = rpc._build_main_request(map_objects_request(), (0, 0, 0))
+    return request.SerializeToString
+
+@benchmark('parse_main_response.get_inventory')
+def bench_parse_inventory():
+    rpc = RpcApi(DummyAuth())
+    response = DummyResponse(payloads.response_envelope(payloads.inventory_response()))
+    subrequests = [RequestType.Value('GET_INVENTORY')]
+    return lambda: rpc._parse_main_response(response, subrequests)
+
+@benchmark('parse_main_response.get_map_objects')
+def bench_parse_map_objects():
+    rpc = RpcApi(DummyAuth())
+    response = DummyResponse(payloads.response_envelope(payloads.map_objects_response()))
+    subrequests = [RequestType.Value('GET_MAP_OBJECTS')]
+    return lambda: rpc._parse_main_response(response, subrequests)
+
+@benchmark('parse_main_response.capture')
+def bench_parse_capture():
+    if not config.capture:
+        return None
+    from pgoapi.capture import read_capture
+    records = [(DummyResponse(bytes(r.response), r.status_code), r.request_types)
+               for r, _ in zip(read_capture(config.capture), range(config.capture_limit))]
+    rpc = RpcApi(DummyAuth())
+    def parse_all():
+        for response, request_types in records:
+            rpc._parse_main_response(response, request_types)
+    return parse_all
+
+@benchmark('protobuf_to_dict.get_inventory')
+def bench_to_dict_inventory():
+    response = payloads.inventory_response()
+    return lambda: protobuf_to_dict(response)
+
+@benchmark('protobuf_to_dict.get_map_objects')
+def bench_to_dict_map_objects():
+    response = payloads.map_objects_response()
+    return lambda: protobuf_to_dict(response)
+
+@benchmark('record_metrics')
+def bench_record_metrics():
+    metrics = MetricsRegistry()
+    RpcApi.describe_metrics(metrics)
+    rpc = RpcApi(DummyAuth(), metrics=metrics)
+    subrequests = [RequestType.Value('GET_PLAYER'), RequestType.Value('GET_INVENTORY')]
+    request = rpc._build_main_request(subrequests, (0, 0, 0))
+    stats = [0.049, 0.01, len(payloads.response_envelope())]
+    return lambda: rpc._record_metrics(subrequests, request, {'status_code': 1}, 0.001, stats, 'ok')
+
+@benchmark('get_cell_ids')
+def bench_get_cell_ids():
+    from pgoapi.cells import get_cell_ids
+    return lambda: get_cell_ids(40.7128, -74.0060)
+
+@benchmark('cover_circle.2km')
+def bench_cover_circle():
+    from pgoapi.cells import cover_circle
+    return lambda: cover_circle(40.7128, -74.0060, 2000)
+
+@benchmark('cover_polygon.box')
+def bench_cover_polygon():
+    from pgoapi.cells import cover_polygon
+    polygon = [(40.70, -74.02), (40.70, -74.00), (40.72, -74.00), (40.72, -74.02)]
+    return lambda: cover_polygon(polygon)
+
+@benchmark('plan_spawns.10k')
+def bench_plan_spawns():
+    from pgoapi.grid import plan_spawns
+    lats, lngs = city_points()
+    spawns = list(zip(lats, lngs))
+    return lambda: plan_spawns(spawns)
+
+def city_points(count=10000):
+    rnd = random.Random(count)
+    return ([40.7 + rnd.random() * 0.1 for i in range(count)],
+            [-74.05 + rnd.random() * 0.1 for i in range(count)])
+
+@benchmark('cell_ids.s2sphere.10k')
+def bench_cell_ids_s2sphere():
+    from s2sphere import CellId, LatLng
+    lats, lngs = city_points()
+    return lambda: [CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).parent(15).id() for lat, lng in zip(lats, lngs)]
+
+@benchmark('cell_ids.numpy.10k')
+def bench_cell_ids_numpy():
+    try:
+        import numpy
+        from pgoapi.cells_numpy import cell_ids
+    except ImportError:
+        return None
+    from s2sphere import CellId, LatLng
+    lats, lngs = [numpy.array(values) for values in city_points()]
+    expected = [CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).parent(15).id() for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    if cell_ids(lats, lngs).tolist() != expected:
+        raise AssertionError('cells_numpy.cell_ids differs from s2sphere')
+    return lambda: cell_ids(lats, lngs)
+
+@benchmark('plan_circle.1km')
+def bench_plan_circle():
+    from pgoapi.grid import plan_circle
+    return lambda: plan_circle(40.7128, -74.0060, 1000)
+
+
+def measure(func, min_time, repeat):
+    # calibrate the number of calls per round, so one round takes about min_time / repeat
+    number = 1
+    while True:
+        started = default_timer()
+        for i in range(number):
+            func()
+        elapsed = default_timer() - started
+        if elapsed >= min_time / repeat / 4 or number >= 10 ** 6:
+            break
+        number *= 2
+    number = max(1, int(number * (min_time / repeat) / max(elapsed, 1e-9)))
+
+    rounds = []
+    for r in range(repeat):
+        started = default_timer()
+        for i in range(number):
+            func()
+        rounds.append((default_timer() - started) / number)
+
+    mean = sum(rounds) / len(rounds)
+    stdev = math.sqrt(sum((x - mean) ** 2 for x in rounds) / len(rounds))
+    return {'min_us': min(rounds) * 1e6, 'mean_us': mean * 1e6, 'stdev_us': stdev * 1e6, 'number': number, 'repeat': repeat}
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print('')
+    print('{0:<40} {1:>12} {2:>12} {3:>8}'.format('[benchmark]', '[baseline]', '[current]', '[ratio]'))
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = result['min_us'] / baseline[name]['min_us']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = ' REGRESSION'
+            regressions.append(name)
+        print('{0:<40} {1:>10.2f}us {2:>10.2f}us {3:>8.2f}{4}'.format(name, baseline[name]['min_us'], result['min_us'], ratio, flag))
+    return regressions
+
+def init_config():
+    parser = argparse.ArgumentParser(description='pgoapi hot path benchmarks')
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    parser.add_argument("-b", "--baseline", default=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'baseline.json'),
+                        help="Baseline results (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", help="Store the results as new baseline", action='store_true')
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown against the baseline (default: 0.1 = 10%%)")
+    parser.add_argument("--capture", help="Capture file with recorded responses for parse_main_response.capture")
+    parser.add_argument("--capture-limit", type=int, default=1000, help="Number of recorded responses to use")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Measuring time per benchmark in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Measuring rounds per benchmark")
+    parser.add_argument("-q", "--quick", help="Short measuring time, for smoke tests", action='store_true')
+    return parser.parse_args()
+
+def main():
+    global config
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    config = init_config()
+    if config.quick:
+        config.min_time, config.repeat = 0.1, 3
+
+    random.seed(1)
+    results = {}
+    print('{0:<40} {1:>12} {2:>12} {3:>10}'.format('[benchmark]', '[min]', '[mean]', '[stdev]'))
+    for name, setup in BENCHMARKS:
+        if config.filter and config.filter not in name:
+            continue
+        func = setup()
+        if func is None:
+            continue
+        result = measure(func, config.min_time, config.repeat)
+        results[name] = result
+        print('{0:<40} {1:>10.2f}us {2:>10.2f}us {3:>9.1f}%'.format(name, result['min_us'], result['mean_us'],
+                                                                    100 * result['stdev_us'] / result['mean_us']))
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+    if config.output:
+        with open(config.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if config.save_baseline:
+        with open(config.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print('\nBaseline stored in {}'.format(config.baseline))
+        return 0
+
+    if os.path.isfile(config.baseline):
+        with open(config.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, config.threshold)
+        if regressions:
+            print('\n{} benchmark(s) slower than the baseline: {}'.format(len(regressions), ', '.join(regressions)))
+            return 1
+
+    return 0
+
+config = None
+
+if __name__ == '__main__':
+    sys.exit(main())
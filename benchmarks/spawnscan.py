@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# add the repository root to PATH, so that the package will be found
+root_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(root_dir)
+
+from pgoapi.cells import get_cell_ids, cover_circle
+from pgoapi.grid import plan_circle
+from pgoapi.world import SyntheticWorld
+from pgoapi.spawndb import SpawnDatabase
+from pgoapi.scheduler import SpawnScheduler
+from pgoapi.utilities import distance
+from pgoapi.protobuf_to_dict import protobuf_to_dict
+
+START = 1500000000.0
+
+
+class Simulation:
+
+    """Scans of a SyntheticWorld on a virtual clock, counting GET_MAP_OBJECTS calls and the pokemon seen."""
+
+    def __init__(self, seed, lat, lng, radius, scan_radius):
+        self.now = START
+        self.world = SyntheticWorld(seed=seed, visible_radius=scan_radius, clock=lambda: self.now)
+        self.lat, self.lng, self.radius, self.scan_radius = lat, lng, radius, scan_radius
+        self.calls = 0
+        self.seen = set()
+
+    def scan(self, lat, lng):
+        self.calls += 1
+        response = protobuf_to_dict(self.world.map_objects(get_cell_ids(lat, lng, self.scan_radius), lat, lng))
+        for map_cell in response.get('map_cells', []):
+            for pokemon in map_cell.get('wild_pokemons', []):
+                if distance(self.lat, self.lng, pokemon['latitude'], pokemon['longitude']) <= self.radius:
+                    self.seen.add(pokemon['encounter_id'])
+        return {'status': 1, 'map_cells': response.get('map_cells', [])}
+
+    def appeared(self, start, end):
+        """Encounter ids of all pokemon in the area which appeared between start and end."""
+        world = SyntheticWorld(seed=self.world._seed, visible_radius=self.radius * 2, nearby_radius=self.radius * 2)
+        cell_ids = cover_circle(self.lat, self.lng, self.radius)
+        encounters = set()
+        already_visible = None
+        now = start
+        while now < end:
+            response = world.map_objects(cell_ids, self.lat, self.lng, now=now)
+            for map_cell in response.map_cells:
+                for pokemon in map_cell.wild_pokemons:
+                    if distance(self.lat, self.lng, pokemon.latitude, pokemon.longitude) <= self.radius:
+                        encounters.add(pokemon.encounter_id)
+            if already_visible is None:
+                already_visible = set(encounters)
+            now += 300
+        return encounters - already_visible
+
+def sweep(sim, points, interval, duration, db=None):
+    end = sim.now + duration
+    i = 0
+    while sim.now < end:
+        lat, lng = points[i % len(points)]
+        response = sim.scan(lat, lng)
+        if db is not None:
+            db.ingest(response)
+        sim.now += interval
+        i += 1
+
+def scheduled(sim, spawns, interval, duration, accounts):
+    scheduler = SpawnScheduler(spawns, scan_radius=sim.scan_radius, clock=lambda: sim.now)
+    end = sim.now + duration
+    busy_until = [sim.now] * accounts
+    while sim.now < end:
+        for job in scheduler.due(sim.now):
+            account = min(range(accounts), key=lambda a: busy_until[a])
+            sim.now, now = max(sim.now, busy_until[account]), sim.now
+            if sim.now <= job.deadline:
+                sim.scan(job.latitude, job.longitude)
+            else:
+                scheduler.missed += 1
+            busy_until[account] = sim.now + interval
+            sim.now = now
+        next_time = scheduler.next_time()
+        sim.now = max(sim.now + 1, min(end, next_time if next_time is not None else end))
+    return scheduler
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Blind sweeps vs. spawn-time scheduled scans on a synthetic world')
+    parser.add_argument("-l", "--location", default="40.7128,-74.0060", help="Center as lat,lng")
+    parser.add_argument("-r", "--radius", type=float, default=500, help="Radius of the area in metres")
+    parser.add_argument("-a", "--accounts", type=int, default=4, help="Number of accounts")
+    parser.add_argument("-i", "--interval", type=float, default=10, help="Seconds between two scans of an account")
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Seed of the synthetic world")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+def main():
+    config = init_config()
+    lat, lng = [float(x) for x in config.location.split(',')]
+    interval = config.interval / config.accounts
+    plan = plan_circle(lat, lng, config.radius)
+
+    # learn the spawn schedules from two hours of sweeping
+    learn = Simulation(config.seed, lat, lng, config.radius, plan.scan_radius)
+    db = SpawnDatabase()
+    sweep(learn, plan.points, interval, 7200, db)
+    spawns = [spawn for spawn in db.spawns(scheduled_only=True)
+              if distance(lat, lng, spawn.latitude, spawn.longitude) <= config.radius]
+
+    # pokemon which appear during the first hour are all visible at some time within two hours;
+    # the calls of both modes over the two hours are reported per hour
+    start = START + 7200
+    total = Simulation(config.seed, lat, lng, config.radius, plan.scan_radius).appeared(start, start + 3600)
+
+    blind = Simulation(config.seed, lat, lng, config.radius, plan.scan_radius)
+    blind.now = start
+    sweep(blind, plan.points, interval, 7200)
+
+    smart = Simulation(config.seed, lat, lng, config.radius, plan.scan_radius)
+    smart.now = start
+    scheduler = scheduled(smart, spawns, config.interval, 7200, config.accounts)
+
+    results = {
+        'pokemon': len(total),
+        'spawn_points': len(spawns),
+        'sweep': {'calls': blind.calls // 2, 'seen': len(blind.seen & total)},
+        'scheduled': {'calls': smart.calls // 2, 'seen': len(smart.seen & total), 'missed_jobs': scheduler.missed, 'jobs': len(scheduler)},
+    }
+
+    print('{} pokemon appeared within {:.0f}m in one hour, {} spawn points learned'.format(len(total), config.radius, len(spawns)))
+    print('{0:<12} {1:>9} {2:>8} {3:>10}'.format('[mode]', '[calls/h]', '[seen]', '[coverage]'))
+    for mode in ('sweep', 'scheduled'):
+        result = results[mode]
+        print('{0:<12} {1:>9} {2:>8} {3:>9.1f}%'.format(mode, result['calls'], result['seen'], 100.0 * result['seen'] / max(1, len(total))))
+
+    if config.output:
+        with open(config.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
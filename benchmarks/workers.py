@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import multiprocessing
+
+# add the repository root to PATH, so that the package will be found
+root_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(root_dir)
+
+from pgoapi.world import SyntheticWorld
+from pgoapi.standin import StandInServer, StandInAuth
+
+from pgoapi.grid import plan_circle
+from pgoapi.workers import ScanRunner
+
+log = logging.getLogger(__name__)
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Throughput of the multi-process ScanRunner against a local stand-in server')
+    parser.add_argument("-p", "--processes", default="1,2,4", help="Comma separated numbers of worker processes to run (default: 1,2,4)")
+    parser.add_argument("-n", "--accounts", type=int, default=8, help="Accounts per run, spread over the worker processes")
+    parser.add_argument("-l", "--location", default="40.7128,-74.0060", help="Center of the scanned area as lat,lng")
+    parser.add_argument("-r", "--radius", type=float, default=1500, help="Radius of the scanned area in metres")
+    parser.add_argument("-s", "--seed", type=int, default=1, help="Seed of the synthetic world")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    return parser.parse_args()
+
+def run_server(seed, address_queue, stop_event):
+    server = StandInServer(SyntheticWorld(seed=seed).handle)
+    server.start()
+    address_queue.put(server.url)
+    stop_event.wait()
+    server.stop()
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    lat, lng = [float(x) for x in config.location.split(',')]
+    plan = plan_circle(lat, lng, config.radius)
+
+    address_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    server = multiprocessing.Process(target=run_server, args=(config.seed, address_queue, stop_event))
+    server.daemon = True
+    server.start()
+    url = address_queue.get(timeout=30)
+
+    accounts = [(StandInAuth(), 'worker{}'.format(i), 'password') for i in range(config.accounts)]
+    results = []
+    print('{0:>11} {1:>10} {2:>11} {3:>8} {4:>8} {5:>12}'.format(
+        '[processes]', '[accounts]', '[positions]', '[errors]', '[steals]', '[positions/s]'))
+    try:
+        for processes in [int(p) for p in config.processes.split(',')]:
+            cells = set()
+
+            def collect(position, response):
+                for map_cell in response['responses']['GET_MAP_OBJECTS'].get('map_cells', []):
+                    cells.add(map_cell['s2_cell_id'])
+
+            runner = ScanRunner(accounts, processes=processes, api_endpoint=url)
+            runner.run(plan.points, callback=collect)
+            stats = runner.stats
+            result = {'processes': processes, 'accounts': len(accounts), 'positions': stats['scanned'],
+                      'errors': stats['errors'], 'steals': stats['steals'], 'cells': len(cells),
+                      'duration': stats['duration'], 'throughput': stats['scanned'] / stats['duration']}
+            results.append(result)
+            print('{0:>11} {1:>10} {2:>11} {3:>8} {4:>8} {5:>12.1f}'.format(
+                processes, len(accounts), result['positions'], result['errors'], result['steals'], result['throughput']))
+    finally:
+        stop_event.set()
+        server.join(5)
+
+    if config.output:
+        with open(config.output, 'w') as f:
+            json.dump({'positions': len(plan), 'radius': config.radius, 'runs': results}, f, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -30,7 +30,6 @@ import sys
 import json
 import time
 import struct
-import random
 import logging
 import requests
 import argparse
@@ -39,10 +38,14 @@ import pprint
 from pgoapi import PGoApi
 from pgoapi.utilities import f2i, h2f
 from pgoapi import utilities as util
+from pgoapi.cells import get_cell_ids
+from pgoapi.grid import plan_circle, plan_spawns
+from pgoapi.mapstore import MapStore
+from pgoapi.ttl import SightingIndex
+from pgoapi.spawndb import SpawnDatabase
 
 from google.protobuf.internal import encoder
 from geopy.geocoders import GoogleV3
-from s2sphere import Cell, CellId, LatLng
 
 log = logging.getLogger(__name__)
 
@@ -57,22 +60,6 @@ def get_pos_by_name(location_name):
 
     return (loc.latitude, loc.longitude, loc.altitude)
 
-def get_cell_ids(lat, long, radius = 10):
-    origin = CellId.from_lat_lng(LatLng.from_degrees(lat, long)).parent(15)
-    walk = [origin.id()]
-    right = origin.next()
-    left = origin.prev()
-
-    # Search around provided radius
-    for i in range(radius):
-        walk.append(right.id())
-        walk.append(left.id())
-        right = right.next()
-        left = left.prev()
-
-    # Return everything
-    return sorted(walk)
-
 def encode(cellid):
     output = []
     encoder._VarintEncoder()(output.append, cellid)
@@ -97,6 +84,7 @@ def init_config():
     parser.add_argument("-l", "--location", help="Location", required=required("location"))
     parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
     parser.add_argument("-t", "--test", help="Only parse the specified location", action='store_true')
+    parser.add_argument("-s", "--spawn-db", help="SQLite spawn point database - known spawn points are scanned instead of the whole area")
     parser.set_defaults(DEBUG=False, TEST=False)
     config = parser.parse_args()
 
@@ -159,39 +147,58 @@ def main():
     # apparently new dict has binary data in it, so formatting it with this method no longer works, pprint works here but there are other alternatives    
     # print('Response dictionary: \n\r{}'.format(json.dumps(response_dict, indent=2)))
     print('Response dictionary: \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(response_dict)))
-    find_poi(api, position[0], position[1])
+    find_poi(api, position[0], position[1], config.spawn_db)
 
-def find_poi(api, lat, lng):
+def find_poi(api, lat, lng, spawn_db=None):
     poi = {'pokemons': {}, 'forts': []}
-    step_size = 0.0015
-    step_limit = 49
-    coords = generate_spiral(lat, lng, step_size, step_limit)
-    for coord in coords:
-        lat = coord['lat']
-        lng = coord['lng']
-        api.set_position(lat, lng, 0)
+    # everything else of the map cells (forts, spawn points, nearby pokemon) goes into the store
+    store = MapStore()
+    sightings = SightingIndex()
+    spawns = SpawnDatabase(spawn_db) if spawn_db else None
+    known = []
+    if spawns is not None:
+        known = [spawn for spawn in spawns.spawns() if util.distance(lat, lng, spawn.latitude, spawn.longitude) <= 500]
+
+    if known:
+        # as few positions as possible which still see every known spawn point
+        plan = plan_spawns(known, scan_radius=70, start=(lat, lng))
+    else:
+        # hexagonal scan positions in travel order, 70m is the radius wild pokemon are visible in
+        plan = plan_circle(lat, lng, 500, scan_radius=70)
+    log.info('Scanning %s positions, %.1f%% of the area covered, %.0fm walking distance',
+             len(plan), plan.coverage * 100, plan.distance)
+    coords = plan.points
+    for lat, lng in coords:
+        # the position belongs to this batch only, the api instance stays untouched
+        batch = api.batch(lat, lng, 0)
+        player_lat, player_lng, _ = batch.get_position()
 
-        
         #get_cellid was buggy -> replaced through get_cell_ids from pokecli
         #timestamp gets computed a different way:
         cell_ids = get_cell_ids(lat, lng)
         timestamps = [0,] * len(cell_ids)
-        api.get_map_objects(latitude = util.f2i(lat), longitude = util.f2i(lng), since_timestamp_ms = timestamps, cell_id = cell_ids)
-        response_dict = api.call()
-        if 'status' in response_dict['responses']['GET_MAP_OBJECTS']:
-            if response_dict['responses']['GET_MAP_OBJECTS']['status'] == 1:
-                for map_cell in response_dict['responses']['GET_MAP_OBJECTS']['map_cells']:
-                    if 'wild_pokemons' in map_cell:
-                        for pokemon in map_cell['wild_pokemons']:
-                            pokekey = get_key_from_pokemon(pokemon)
-                            pokemon['hides_at'] = time.time() + pokemon['time_till_hidden_ms']/1000
-                            poi['pokemons'][pokekey] = pokemon
+        batch.get_map_objects(latitude = player_lat, longitude = player_lng, since_timestamp_ms = timestamps, cell_id = cell_ids)
+        response_dict = batch.execute()
+        store.ingest(response_dict)
+        if spawns is not None:
+            spawns.ingest(response_dict)
+        # sightings get a 'hides_at' and are dropped again once they despawned
+        sightings.ingest(response_dict)
+        sightings.expire()
 
         # time.sleep(0.51)
+    for encounter_id, pokemon in sightings.visible():
+        if 'pokemon_data' in pokemon:
+            poi['pokemons'][get_key_from_pokemon(pokemon)] = pokemon
+    if spawns is not None:
+        spawns.close()
+    poi['forts'] = [{'id': fort.id, 'latitude': fort.latitude, 'longitude': fort.longitude, 'type': fort.type}
+                    for fort in store.forts.values()]
+    log.info('%s forts, %s spawn points and %s pokemon found', len(store.forts), len(store.spawn_points), len(store.pokemons))
     # new dict, binary data
     # print('POI dictionary: \n\r{}'.format(json.dumps(poi, indent=2)))
     print('POI dictionary: \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(poi)))
-    print('Open this in a browser to see the path the spiral search took:')
+    print('Open this in a browser to see the path the search took:')
     print_gmaps_dbug(coords)
 
 def get_key_from_pokemon(pokemon):
@@ -199,33 +206,9 @@ def get_key_from_pokemon(pokemon):
 
 def print_gmaps_dbug(coords):
     url_string = 'http://maps.googleapis.com/maps/api/staticmap?size=400x400&path='
-    for coord in coords:
-        url_string += '{},{}|'.format(coord['lat'], coord['lng'])
+    for lat, lng in coords:
+        url_string += '{},{}|'.format(lat, lng)
     print(url_string[:-1])
 
-def generate_spiral(starting_lat, starting_lng, step_size, step_limit):
-    coords = [{'lat': starting_lat, 'lng': starting_lng}]
-    steps,x,y,d,m = 1, 0, 0, 1, 1
-    rlow = 0.0
-    rhigh = 0.0005
-
-    while steps < step_limit:
-        while 2 * x * d < m and steps < step_limit:
-            x = x + d
-            steps += 1
-            lat = x * step_size + starting_lat + random.uniform(rlow, rhigh)
-            lng = y * step_size + starting_lng + random.uniform(rlow, rhigh)
-            coords.append({'lat': lat, 'lng': lng})
-        while 2 * y * d < m and steps < step_limit:
-            y = y + d
-            steps += 1
-            lat = x * step_size + starting_lat + random.uniform(rlow, rhigh)
-            lng = y * step_size + starting_lng + random.uniform(rlow, rhigh)
-            coords.append({'lat': lat, 'lng': lng})
-
-        d = -1 * d
-        m = m + 1
-    return coords
-
 if __name__ == '__main__':
     main()
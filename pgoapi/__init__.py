@@ -16,9 +16,14 @@ except:
 if (not protobuf_exist) or (int(protobuf_version[:1]) < 3):
     raise PleaseInstallProtobufVersion3()
 
-from pgoapi.pgoapi import PGoApi
+from pgoapi.pgoapi import PGoApi, RequestBatch
 from pgoapi.rpc_api import RpcApi
+from pgoapi.batcher import RequestBatcher
+from pgoapi.dispatcher import RequestDispatcher, PRIORITY_INTERACTIVE, PRIORITY_SCAN, PRIORITY_HOUSEKEEPING
 from pgoapi.auth import Auth
+from pgoapi.limiter import AdaptiveLimiter
+from pgoapi.breaker import CircuitBreaker, CircuitBreakers
+from pgoapi.metrics import MetricsRegistry
 
 try:
     import requests.packages.urllib3
@@ -0,0 +1,173 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from pgoapi.utilities import request_type
+
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+
+class RequestFuture:
+    """
+    Result of a subrequest batch which was queued on a RequestBatcher.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._result = None
+        self._exception = None
+
+    def done(self):
+        return self._event.is_set()
+
+    def set_result(self, result):
+        self._result = result
+        self._event.set()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._event.set()
+
+    def result(self, timeout=None):
+        if not self._event.wait(timeout):
+            raise RuntimeError('Request batch not executed within {} seconds'.format(timeout))
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+class RequestBatcher:
+    """
+    Merges the subrequests of concurrent callers on one account into as few
+    RPCs as possible.
+
+    The first submitted batch opens a window of `window` seconds. Every batch
+    submitted within that window ends up in the same RequestEnvelope, unless
+    it needs another player position or sends a request type which is already
+    part of the envelope with different arguments. Identical subrequests are
+    only sent once. Each caller gets back a response dictionary shaped like
+    the one of PGoApi.call(), containing only its own subrequests:
+
+        batcher = RequestBatcher(api)
+        future = batcher.submit(api.batch().get_inventory())
+        response = future.result()
+    """
+
+    def __init__(self, api, window=0.005):
+
+        self.log = logging.getLogger(__name__)
+
+        self._api = api
+        self._window = window
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def submit(self, batch):
+        future = RequestFuture()
+        req_method_list = list(batch._req_method_list)
+
+        if not req_method_list:
+            future.set_result(False)
+            return future
+
+        with self._lock:
+            self._pending.append((req_method_list, batch.get_position(), future))
+            if self._timer is None:
+                self._timer = threading.Timer(self._window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return future
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not pending:
+            return
+
+        envelopes = self._merge(pending)
+        self.log.debug('Merged %s queued batches into %s RPCs', len(pending), len(envelopes))
+
+        for player_position, req_method_list, callers in envelopes:
+            self._execute(player_position, req_method_list, callers)
+
+    def _merge(self, pending):
+        envelopes = []
+
+        for req_method_list, player_position, future in pending:
+            for envelope in envelopes:
+                if envelope[0] == player_position and self._fits(envelope[1], req_method_list):
+                    break
+            else:
+                envelope = (player_position, [], [])
+                envelopes.append(envelope)
+
+            for entry in req_method_list:
+                if entry not in envelope[1]:
+                    envelope[1].append(entry)
+            envelope[2].append((req_method_list, future))
+
+        return envelopes
+
+    def _fits(self, merged_list, req_method_list):
+        merged_types = dict((request_type(entry), entry) for entry in merged_list)
+        for entry in req_method_list:
+            entry_id = request_type(entry)
+            if entry_id in merged_types and merged_types[entry_id] != entry:
+                return False
+        return True
+
+    def _execute(self, player_position, req_method_list, callers):
+        try:
+            response = self._api._call(req_method_list, player_position)
+        except Exception as e:
+            for _, future in callers:
+                future.set_exception(e)
+            return
+
+        for caller_list, future in callers:
+            if not isinstance(response, dict):
+                future.set_result(response)
+                continue
+
+            caller_response = dict((key, value) for key, value in response.items() if key != 'responses')
+            caller_response['responses'] = {}
+            responses = response.get('responses', {})
+            for entry in caller_list:
+                entry_name = RequestType.Name(request_type(entry))
+                if entry_name in responses:
+                    caller_response['responses'][entry_name] = responses[entry_name]
+            future.set_result(caller_response)
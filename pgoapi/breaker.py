@@ -0,0 +1,151 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one endpoint or account.
+
+    After `failure_threshold` consecutive failures the circuit opens and every
+    call fails fast for `reset_timeout` seconds. Then it turns half-open and
+    lets up to `half_open_calls` probe calls through - if all of them succeed
+    the circuit closes again, a single failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, half_open_calls=1):
+
+        self.log = logging.getLogger(__name__)
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._probes = 0
+        self._probe_successes = 0
+
+    def get_state(self):
+        with self._lock:
+            self._check_timeout()
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            self._check_timeout()
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN and self._probes < self._half_open_calls:
+                self._probes += 1
+                return True
+
+            return False
+
+    def cancel(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record(self, success):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if not success:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self._half_open_calls:
+                        self.log.info('Circuit closed again')
+                        self._state = self.CLOSED
+                        self._failures = 0
+            elif success:
+                self._failures = 0
+            else:
+                self._failures += 1
+                if self._state == self.CLOSED and self._failures >= self._failure_threshold:
+                    self._open()
+
+    def _open(self):
+        self.log.warning('Circuit opened for %s seconds', self._reset_timeout)
+        self._state = self.OPEN
+        self._opened_at = time.time()
+
+    def _check_timeout(self):
+        if self._state == self.OPEN and time.time() - self._opened_at >= self._reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+
+
+class CircuitBreakers:
+    """
+    Registry of the circuit breakers per api endpoint and per account.
+
+    Share one registry between all PGoApi instances so an overloaded endpoint
+    is shielded from every worker:
+
+        breakers = CircuitBreakers(failure_threshold=5, reset_timeout=30)
+        api.set_breakers(breakers)
+    """
+
+    def __init__(self, **breaker_args):
+        self._breaker_args = breaker_args
+
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._accounts = {}
+
+    def for_endpoint(self, endpoint):
+        return self._get(self._endpoints, endpoint)
+
+    def for_account(self, account):
+        return self._get(self._accounts, account)
+
+    def get_endpoint_states(self):
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+        return dict((endpoint, breaker.get_state()) for endpoint, breaker in endpoints)
+
+    def _get(self, breakers, key):
+        with self._lock:
+            breaker = breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(**self._breaker_args)
+                breakers[key] = breaker
+            return breaker
@@ -0,0 +1,387 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import mmap
+import time
+import struct
+import logging
+import threading
+
+import six
+
+from collections import deque
+
+from pgoapi.rpc_api import RpcApi
+from pgoapi.utilities import request_type
+
+from . import protos
+from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope
+
+# Capture file layout:
+#
+#   magic   CAPTURE_MAGIC
+#   record  header (send timestamp, latency, http status, number of request types,
+#           request length, response length), request types (uint16 each),
+#           request envelope bytes, response envelope bytes
+#   ...
+#
+# The index file <capture>.idx holds one (record offset, send timestamp) entry per
+# record, so readers can seek to record N or to a point in time directly.
+
+CAPTURE_MAGIC = b'PGOCAP01'
+RECORD_HEADER = struct.Struct('<ddHHII')
+INDEX_ENTRY = struct.Struct('<Qd')
+
+
+class CaptureRecord:
+    __slots__ = ('timestamp', 'latency', 'status_code', 'request_types', 'request', 'response')
+
+    def __init__(self, timestamp, latency, status_code, request_types, request, response):
+        self.timestamp = timestamp
+        self.latency = latency
+        self.status_code = status_code
+        self.request_types = request_types
+        self.request = request
+        self.response = response
+
+    # RpcApi._parse_main_response expects a http response object
+    @property
+    def content(self):
+        return self.response
+
+
+class CaptureWriter:
+
+    def __init__(self, path):
+
+        self.log = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self._index = open(index_path(path), 'ab')
+
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+
+    def write(self, request_types, request_bytes, status_code, response_bytes, timestamp=None, latency=0.0):
+        if timestamp is None:
+            timestamp = time.time()
+        response_bytes = response_bytes or b''
+
+        header = RECORD_HEADER.pack(timestamp, latency, status_code, len(request_types), len(request_bytes), len(response_bytes))
+        types = struct.pack('<{}H'.format(len(request_types)), *request_types)
+
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(header)
+            self._file.write(types)
+            self._file.write(request_bytes)
+            self._file.write(response_bytes)
+            self._index.write(INDEX_ENTRY.pack(offset, timestamp))
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+            self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CaptureRecorder:
+    """
+    Appends the raw request and response envelopes of every RPC of a PGoApi
+    instance to a capture file:
+
+        recorder = CaptureRecorder('traffic.pgocap')
+        recorder.attach(api)
+        ...
+        recorder.close()
+    """
+
+    def __init__(self, path):
+        self._writer = CaptureWriter(path)
+
+    def attach(self, api):
+        api.add_hook('before_send', self._before_send)
+        api.add_hook('after_receive', self._after_receive)
+
+    def detach(self, api):
+        api.remove_hook('before_send', self._before_send)
+        api.remove_hook('after_receive', self._after_receive)
+
+    def close(self):
+        self._writer.close()
+
+    def _before_send(self, context):
+        context['sent_at'] = time.time()
+
+    def _after_receive(self, context):
+        sent_at = context.get('sent_at', time.time())
+        request_types = [request_type(entry) for entry in context['subrequests']]
+        self._writer.write(request_types, context['request_bytes'], context['status_code'], context['response_bytes'],
+                           sent_at, time.time() - sent_at)
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def parse_record(buf, offset):
+    timestamp, latency, status_code, type_count, request_length, response_length = RECORD_HEADER.unpack_from(buf, offset)
+    offset += RECORD_HEADER.size
+    request_types = list(struct.unpack_from('<{}H'.format(type_count), buf, offset))
+    offset += 2 * type_count
+    request = buf[offset:offset + request_length]
+    offset += request_length
+    response = buf[offset:offset + response_length]
+    offset += response_length
+    return CaptureRecord(timestamp, latency, status_code, request_types, request, response), offset
+
+
+def _buffer_view(data, size=None):
+    """Zero-copy view of a bytes-like object (e.g. an mmap), limited to size bytes."""
+    if size is None:
+        size = len(data)
+    if six.PY2:
+        # memoryview does not accept mmap objects on Python 2
+        return buffer(data, 0, size)  # noqa: F821
+    return memoryview(data)[:size]
+
+
+def read_capture(path):
+    with open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError('{} is not a pgoapi capture file'.format(path))
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            type_count, request_length, response_length = RECORD_HEADER.unpack(header)[3:]
+            body = f.read(2 * type_count + request_length + response_length)
+            record, _ = parse_record(header + body, 0)
+            yield record
+
+
+class CaptureFile:
+    """
+    Random access to a capture file over mmap.
+
+    Records are located over the index file (rebuilt in memory if it is
+    missing or incomplete) and their request/response envelopes are
+    memoryview slices of the mapped file, which can be handed to
+    ParseFromString without copying (on Python 2 they are copied into
+    strings). Records must not be used after the file was closed.
+
+        with CaptureFile('traffic.pgocap') as capture:
+            record = capture[1000]
+            for record in capture.between(start_ts, end_ts):
+                ...
+    """
+
+    def __init__(self, path):
+
+        self.log = logging.getLogger(__name__)
+
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = _buffer_view(self._mmap)
+        self._index_file = None
+        self._index = None
+
+        if bytes(self._view[:len(CAPTURE_MAGIC)]) != CAPTURE_MAGIC:
+            self.close()
+            raise ValueError('{} is not a pgoapi capture file'.format(path))
+
+        self._index = self._load_index(index_path(path))
+        self._count = len(self._index) // INDEX_ENTRY.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, n):
+        if n < 0:
+            n += self._count
+        if not 0 <= n < self._count:
+            raise IndexError('capture record out of range')
+        return parse_record(self._view, self.offset(n))[0]
+
+    def __iter__(self):
+        for n in range(self._count):
+            yield self[n]
+
+    def offset(self, n):
+        return INDEX_ENTRY.unpack_from(self._index, n * INDEX_ENTRY.size)[0]
+
+    def timestamp(self, n):
+        return INDEX_ENTRY.unpack_from(self._index, n * INDEX_ENTRY.size)[1]
+
+    def find(self, timestamp):
+        """Position of the first record sent at or after timestamp."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def between(self, start, end):
+        for n in range(self.find(start), self._count):
+            if self.timestamp(n) >= end:
+                return
+            yield self[n]
+
+    def close(self):
+        for view in (self._view, self._index):
+            if isinstance(view, memoryview):
+                view.release()
+        try:
+            for m in (self._mmap, self._index_file):
+                if m is not None:
+                    m.close()
+        except BufferError:
+            # records handed out are still alive, the mapping goes away with them
+            self.log.debug('Capture records still in use - mapping is kept until they are released')
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _load_index(self, path):
+        index = b''
+        if os.path.exists(path) and os.path.getsize(path) >= INDEX_ENTRY.size:
+            with open(path, 'rb') as f:
+                self._index_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            usable = len(self._index_file) - len(self._index_file) % INDEX_ENTRY.size
+            index = _buffer_view(self._index_file, usable)
+
+        # records written after the last index entry (e.g. after a crash)
+        # are indexed by scanning the capture file
+        count = len(index) // INDEX_ENTRY.size
+        if count:
+            last = parse_record(self._view, INDEX_ENTRY.unpack_from(index, (count - 1) * INDEX_ENTRY.size)[0])
+            offset = last[1]
+        else:
+            offset = len(CAPTURE_MAGIC)
+
+        if offset >= len(self._view):
+            return index
+
+        self.log.info('Capture index incomplete - scanning from offset %s', offset)
+        entries = bytearray(index)
+        while offset + RECORD_HEADER.size <= len(self._view):
+            record, next_offset = parse_record(self._view, offset)
+            if next_offset > len(self._view):
+                break
+            entries += INDEX_ENTRY.pack(offset, record.timestamp)
+            offset = next_offset
+        return entries
+
+
+def replay(records, realtime=False, speed=1.0):
+    """
+    Feeds capture records through RpcApi._parse_main_response and yields the
+    tuples (record, response dictionary). With realtime=True the original gaps
+    between the RPCs are kept (divided by speed).
+    """
+    if not hasattr(records, '__iter__') or isinstance(records, six.string_types):
+        records = read_capture(records)
+
+    rpc = RpcApi(None)
+    first_recorded = first_replayed = None
+
+    for record in records:
+        if realtime:
+            now = time.time()
+            if first_recorded is None:
+                first_recorded, first_replayed = record.timestamp, now
+            delay = (record.timestamp - first_recorded) / speed - (now - first_replayed)
+            if delay > 0:
+                time.sleep(delay)
+
+        yield record, rpc._parse_main_response(record, record.request_types)
+
+
+class ReplayHandler:
+    """
+    StandInServer handler answering requests with recorded responses.
+
+    Requests are matched by their list of request types; the recorded
+    responses for one list are served in order and start over when all of
+    them have been used. Unknown request type lists get the next recorded
+    response. With realtime=True the recorded latency is simulated.
+    """
+
+    def __init__(self, records, realtime=False):
+
+        self.log = logging.getLogger(__name__)
+
+        if not hasattr(records, '__iter__') or isinstance(records, six.string_types):
+            records = read_capture(records)
+
+        self._realtime = realtime
+        self._lock = threading.Lock()
+        self._by_types = {}
+        self._all = deque()
+
+        for record in records:
+            entry = (record.status_code, bytes(record.response), record.latency)
+            self._by_types.setdefault(tuple(record.request_types), deque()).append(entry)
+            self._all.append(entry)
+
+        if not self._all:
+            raise ValueError('No records to replay')
+
+    def __call__(self, request_bytes):
+        request = RequestEnvelope()
+        request.ParseFromString(request_bytes)
+        request_types = tuple(r.request_type for r in request.requests)
+
+        with self._lock:
+            queue = self._by_types.get(request_types, self._all)
+            status_code, response, latency = queue[0]
+            queue.rotate(-1)
+
+        if self._realtime and latency > 0:
+            time.sleep(latency)
+
+        return status_code, response
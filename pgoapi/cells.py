@@ -0,0 +1,114 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+from s2sphere import Angle, Cap, Cell, CellId, LatLng, LatLngRect, RegionCoverer
+
+from pgoapi.utilities import EARTH_RADIUS, point_in_polygon, segments_intersect
+
+# level of the cells the map objects are stored in
+CELL_LEVEL = 15
+
+# number of cells the clients traditionally send with a single GET_MAP_OBJECTS request
+MAX_CELLS_PER_REQUEST = 21
+
+DEFAULT_RADIUS = 200
+
+
+def _coverer(level):
+    coverer = RegionCoverer()
+    coverer.min_level = level
+    coverer.max_level = level
+    # never merge cells to stay within max_cells, all cells have to be on the same level
+    coverer.max_cells = 1 << 30
+    return coverer
+
+def cover_circle(lat, lng, radius=DEFAULT_RADIUS, level=CELL_LEVEL):
+    """Returns the sorted ids of all cells intersecting the circle of radius metres around lat/lng."""
+    center = LatLng.from_degrees(lat, lng).to_point()
+    cap = Cap.from_axis_angle(center, Angle.from_radians(radius / EARTH_RADIUS))
+    return sorted(cell_id.id() for cell_id in _coverer(level).get_covering(cap))
+
+def cover_rect(lat1, lng1, lat2, lng2, level=CELL_LEVEL):
+    """Returns the sorted ids of all cells intersecting the lat/lng rectangle spanned by the two corners."""
+    rect = LatLngRect.from_point_pair(LatLng.from_degrees(lat1, lng1), LatLng.from_degrees(lat2, lng2))
+    return sorted(cell_id.id() for cell_id in _coverer(level).get_covering(rect))
+
+def cover_polygon(points, level=CELL_LEVEL):
+    """
+    Returns the sorted ids of all cells intersecting the polygon given as list of (lat, lng) vertices.
+
+    The polygon is treated as planar in lat/lng, which is accurate enough for city sized areas
+    but not for polygons crossing the antimeridian or a pole.
+    """
+    if len(points) < 3:
+        raise ValueError('A polygon needs at least 3 points')
+
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    rect = LatLngRect.from_point_pair(LatLng.from_degrees(min(lats), min(lngs)),
+                                      LatLng.from_degrees(max(lats), max(lngs)))
+
+    edges = list(zip(points, points[1:] + points[:1]))
+    cell_ids = []
+    for cell_id in _coverer(level).get_covering(rect):
+        if _cell_intersects(Cell(cell_id), points, edges):
+            cell_ids.append(cell_id.id())
+    return sorted(cell_ids)
+
+def get_cell_ids(lat, lng, radius=DEFAULT_RADIUS):
+    """Cell ids for a GET_MAP_OBJECTS request around lat/lng."""
+    return cover_circle(lat, lng, radius)
+
+def chunk_cells(cell_ids, size=MAX_CELLS_PER_REQUEST):
+    """Splits cell_ids into lists which fit into single GET_MAP_OBJECTS requests."""
+    return [cell_ids[i:i + size] for i in range(0, len(cell_ids), size)]
+
+def spawnpoint_id(lat, lng):
+    """The spawnpoint_id of the server for a spawn point at lat/lng: the token of its level 20 cell (leading zeros kept)."""
+    return CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).parent(20).to_token()
+
+def cell_center(cell_id):
+    latlng = LatLng.from_point(Cell(CellId(cell_id)).get_center())
+    return latlng.lat().degrees, latlng.lng().degrees
+
+def _cell_intersects(cell, points, edges):
+    vertices = []
+    for k in range(4):
+        latlng = LatLng.from_point(cell.get_vertex(k))
+        vertices.append((latlng.lat().degrees, latlng.lng().degrees))
+
+    if any(point_in_polygon(v, points) for v in vertices):
+        return True
+    if any(cell.contains(LatLng.from_degrees(p[0], p[1]).to_point()) for p in points):
+        return True
+
+    cell_edges = list(zip(vertices, vertices[1:] + vertices[:1]))
+    for a, b in edges:
+        for c, d in cell_edges:
+            if segments_intersect(a, b, c, d):
+                return True
+    return False
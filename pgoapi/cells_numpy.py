@@ -0,0 +1,105 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import numpy as np
+
+from s2sphere import LOOKUP_POS, LOOKUP_BITS, SWAP_MASK, INVERT_MASK
+
+from pgoapi.cells import CELL_LEVEL
+
+MAX_LEVEL = 30
+MAX_SIZE = 1 << MAX_LEVEL
+POS_BITS = 2 * MAX_LEVEL + 1
+
+_LOOKUP_POS = np.array(LOOKUP_POS, dtype=np.uint64)
+_LOOKUP_MASK = np.uint64((1 << LOOKUP_BITS) - 1)
+_ORIENTATION_MASK = np.uint64(SWAP_MASK | INVERT_MASK)
+
+
+def cell_ids(lats, lngs, level=CELL_LEVEL):
+    """
+    Returns the ids of the cells at level containing the points given as arrays of lat/lng in degrees.
+
+    Same arithmetic as s2sphere's CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).parent(level),
+    applied to whole arrays at once. The result is a uint64 array.
+    """
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+    if lats.shape != lngs.shape:
+        raise ValueError('lats and lngs need to have the same shape')
+    if not 0 <= level <= MAX_LEVEL:
+        raise ValueError('level has to be between 0 and {}'.format(MAX_LEVEL))
+
+    cosphi = np.cos(lats)
+    x = np.cos(lngs) * cosphi
+    y = np.sin(lngs) * cosphi
+    z = np.sin(lats)
+
+    face, u, v = _xyz_to_face_uv(x, y, z)
+    i = _st_to_ij(_uv_to_st(u))
+    j = _st_to_ij(_uv_to_st(v))
+    return _from_face_ij(face, i, j, level)
+
+def _xyz_to_face_uv(x, y, z):
+    ax, ay, az = np.abs(x), np.abs(y), np.abs(z)
+    # same tie breaking as s2sphere's Point.largest_abs_component
+    axis = np.where(ax > ay, np.where(ax > az, 0, 2), np.where(ay > az, 1, 2))
+    component = np.choose(axis, (x, y, z))
+    face = axis + np.where(component < 0, 3, 0)
+
+    # numerators per face, see s2sphere.valid_face_xyz_to_uv
+    u = np.choose(face, (y, -x, -x, z, z, -y))
+    v = np.choose(face, (z, z, -y, y, -x, -x))
+    return face, u / component, v / component
+
+def _uv_to_st(u):
+    # quadratic projection; the sqrt of the negative branch is masked out by np.where
+    with np.errstate(invalid='ignore'):
+        return np.where(u >= 0, 0.5 * np.sqrt(1 + 3 * u), 1 - 0.5 * np.sqrt(1 - 3 * u))
+
+def _st_to_ij(s):
+    return np.clip(np.floor(MAX_SIZE * s), 0, MAX_SIZE - 1).astype(np.uint64)
+
+def _from_face_ij(face, i, j, level):
+    face = face.astype(np.uint64)
+    n = face << np.uint64(POS_BITS - 1)
+    bits = face & np.uint64(SWAP_MASK)
+
+    # the position bits below the requested level are cut by the parent mask,
+    # so only the lookups covering the upper levels are needed
+    last = max(0, (MAX_LEVEL - level) // LOOKUP_BITS)
+    for k in range(7, last - 1, -1):
+        shift = np.uint64(k * LOOKUP_BITS)
+        bits = bits + (((i >> shift) & _LOOKUP_MASK) << np.uint64(LOOKUP_BITS + 2))
+        bits = bits + (((j >> shift) & _LOOKUP_MASK) << np.uint64(2))
+        bits = _LOOKUP_POS[bits]
+        n |= (bits >> np.uint64(2)) << np.uint64(k * 2 * LOOKUP_BITS)
+        bits &= _ORIENTATION_MASK
+
+    leaf = n * np.uint64(2) + np.uint64(1)
+    lsb = np.uint64(1 << (2 * (MAX_LEVEL - level)))
+    return (leaf & ~(lsb - np.uint64(1))) | lsb
@@ -0,0 +1,168 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+from collections import deque
+
+from pgoapi.batcher import RequestFuture
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCAN = 1
+PRIORITY_HOUSEKEEPING = 2
+
+
+class RequestDispatcher:
+    """
+    Executes the request batches of one account in priority order.
+
+    Every batch is queued in one of the lanes PRIORITY_INTERACTIVE,
+    PRIORITY_SCAN or PRIORITY_HOUSEKEEPING. The worker thread always takes the
+    oldest batch of the most urgent non-empty lane, unless the head of a lower
+    lane has been waiting longer than `max_wait` seconds - then that one goes
+    first, so bulk work can not starve. Consecutive RPCs are at least
+    `min_interval` seconds apart. Batches still queued when the dispatcher
+    is stopped fail with a RuntimeError.
+
+        dispatcher = RequestDispatcher(api, min_interval=0.5)
+        future = dispatcher.submit(api.batch().release_pokemon(pokemon_id=pid), PRIORITY_INTERACTIVE)
+        response = future.result()
+    """
+
+    LANES = (PRIORITY_INTERACTIVE, PRIORITY_SCAN, PRIORITY_HOUSEKEEPING)
+
+    def __init__(self, api, min_interval=0.0, max_wait=10.0):
+
+        self.log = logging.getLogger(__name__)
+
+        self._api = api
+        self._min_interval = min_interval
+        self._max_wait = max_wait
+
+        self._lanes = dict((lane, deque()) for lane in self.LANES)
+        self._condition = threading.Condition()
+        self._last_call = 0
+        self._running = False
+        self._stopped = False
+        self._worker = None
+
+    def start(self):
+        with self._condition:
+            self._start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._stopped = True
+            pending = []
+            for lane in self.LANES:
+                pending.extend(self._lanes[lane])
+                self._lanes[lane].clear()
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+        for queued_at, req_method_list, player_position, future in pending:
+            future.set_exception(RuntimeError('Request dispatcher stopped before the batch was executed'))
+
+    def submit(self, batch, priority=PRIORITY_SCAN):
+        if priority not in self._lanes:
+            raise ValueError('Unknown priority lane: {}'.format(priority))
+
+        future = RequestFuture()
+        req_method_list = list(batch._req_method_list)
+        if not req_method_list:
+            future.set_result(False)
+            return future
+
+        with self._condition:
+            self._start()
+            self._lanes[priority].append((time.time(), req_method_list, batch.get_position(), future))
+            self._condition.notify()
+
+        return future
+
+    def queue_size(self, priority=None):
+        with self._condition:
+            if priority is None:
+                return sum(len(lane) for lane in self._lanes.values())
+            return len(self._lanes[priority])
+
+    def _start(self):
+        if self._stopped:
+            raise RuntimeError('Request dispatcher was stopped')
+        if self._running:
+            return
+        self._running = True
+        self._worker = threading.Thread(target=self._run)
+        self._worker.daemon = True
+        self._worker.start()
+
+    def _next(self, now):
+        starved = None
+        for lane in self.LANES:
+            queue = self._lanes[lane]
+            if queue and now - queue[0][0] >= self._max_wait:
+                if starved is None or queue[0][0] < self._lanes[starved][0][0]:
+                    starved = lane
+
+        if starved is not None:
+            return self._lanes[starved].popleft()
+
+        for lane in self.LANES:
+            if self._lanes[lane]:
+                return self._lanes[lane].popleft()
+
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not any(self._lanes.values()):
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+                # pacing is applied before a batch is picked, so a batch which
+                # arrives while we are waiting can still take precedence
+                delay = self._last_call + self._min_interval - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                entry = self._next(time.time())
+                self._last_call = time.time()
+
+            queued_at, req_method_list, player_position, future = entry
+            self.log.debug('Dispatching batch after %.3fs in queue', time.time() - queued_at)
+            try:
+                future.set_result(self._api._call(req_method_list, player_position))
+            except Exception as e:
+                future.set_exception(e)
@@ -33,4 +33,10 @@ class ServerBusyOrOfflineException(Exception):
     pass
     
 class PleaseInstallProtobufVersion3(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class CircuitOpenException(ServerBusyOrOfflineException):
+    pass
+
+class ServerTimeoutException(ServerBusyOrOfflineException):
+    pass
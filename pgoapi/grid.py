@@ -0,0 +1,375 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import math
+import heapq
+import logging
+
+from pgoapi.utilities import EARTH_RADIUS, point_in_polygon, segments_intersect
+
+log = logging.getLogger(__name__)
+
+# radius around the player in which the server returns wild pokemon
+DEFAULT_SCAN_RADIUS = 70
+
+SQRT3 = math.sqrt(3)
+
+# lattice offsets tried per axis, the plan with the fewest points wins
+OFFSET_STEPS = 3
+
+# window and maximum number of the 2-opt passes over the serpentine order, later passes gain little
+OPTIMIZE_WINDOW = 40
+OPTIMIZE_PASSES = 3
+
+
+class ScanPlan:
+    """Scan positions covering an area, in travel order."""
+
+    def __init__(self, points, scan_radius, area, coverage, distance):
+        self.points = points
+        self.scan_radius = scan_radius
+        self.area = area
+        self.coverage = coverage
+        self.distance = distance
+
+    @property
+    def overlap(self):
+        """Scanned disk area per square metre of the area (1.0 would be a perfect tiling)."""
+        if not self.area:
+            return 0.0
+        return len(self.points) * math.pi * self.scan_radius ** 2 / self.area
+
+    def __len__(self):
+        return len(self.points)
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __repr__(self):
+        return '<ScanPlan points={} coverage={:.4f} overlap={:.2f} distance={:.0f}m>'.format(
+            len(self.points), self.coverage, self.overlap, self.distance)
+
+
+def plan_circle(lat, lng, radius, scan_radius=DEFAULT_SCAN_RADIUS, start=None):
+    """Plans the scan positions covering the circle of radius metres around lat/lng."""
+    projection = _Projection(lat, lng)
+    return _plan(projection, _Circle(0.0, 0.0, radius), scan_radius, start)
+
+def plan_polygon(points, scan_radius=DEFAULT_SCAN_RADIUS, start=None):
+    """Plans the scan positions covering the polygon given as list of (lat, lng) vertices."""
+    if len(points) < 3:
+        raise ValueError('A polygon needs at least 3 points')
+    projection = _Projection(sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+    return _plan(projection, _Polygon([projection.to_xy(*p) for p in points]), scan_radius, start)
+
+def plan_spawns(spawns, scan_radius=DEFAULT_SCAN_RADIUS, start=None):
+    """
+    Plans a near-minimal set of scan positions which sees all spawns, given as (lat, lng) or objects with latitude/longitude.
+
+    Greedy set cover: candidates are the spawn points themselves and the centroids of their neighbourhoods, found over
+    a grid of scan_radius buckets, and the candidate which sees most of the remaining spawns is taken next (lazy
+    evaluation over a heap). coverage of the plan is the share of spawns seen.
+    """
+    if scan_radius <= 0:
+        raise ValueError('scan_radius has to be positive')
+
+    coords = [(s.latitude, s.longitude) if hasattr(s, 'latitude') else (s[0], s[1]) for s in spawns]
+    if not coords:
+        return ScanPlan([], scan_radius, 0.0, 1.0, 0.0)
+
+    projection = _Projection(sum(c[0] for c in coords) / len(coords), sum(c[1] for c in coords) / len(coords))
+    points = [projection.to_xy(lat, lng) for lat, lng in coords]
+
+    r = scan_radius
+    r2 = r * r
+    buckets = {}
+    for k, (x, y) in enumerate(points):
+        buckets.setdefault((int(math.floor(x / r)), int(math.floor(y / r))), []).append((x, y, k))
+    get = buckets.get
+
+    def within(x, y):
+        bx, by = int(math.floor(x / r)), int(math.floor(y / r))
+        neighbours = (get((bx - 1, by - 1)), get((bx, by - 1)), get((bx + 1, by - 1)),
+                      get((bx - 1, by)), get((bx, by)), get((bx + 1, by)),
+                      get((bx - 1, by + 1)), get((bx, by + 1)), get((bx + 1, by + 1)))
+        return [k for bucket in neighbours if bucket for px, py, k in bucket
+                if (px - x) * (px - x) + (py - y) * (py - y) <= r2]
+
+    candidates = []
+    for x, y in points:
+        seen = within(x, y)
+        candidates.append(((x, y), seen))
+        if len(seen) > 1:
+            cx = sum(points[k][0] for k in seen) / len(seen)
+            cy = sum(points[k][1] for k in seen) / len(seen)
+            candidates.append(((cx, cy), within(cx, cy)))
+
+    heap = [(-len(seen), i) for i, (position, seen) in enumerate(candidates)]
+    heapq.heapify(heap)
+    uncovered = set(range(len(points)))
+    chosen = []
+    while uncovered and heap:
+        gain, i = heapq.heappop(heap)
+        position, seen = candidates[i]
+        # gains only shrink, so a candidate whose fresh gain still beats the next best is the best
+        seen = [k for k in seen if k in uncovered]
+        if not seen:
+            continue
+        if heap and len(seen) < -heap[0][0]:
+            candidates[i] = (position, seen)
+            heapq.heappush(heap, (-len(seen), i))
+            continue
+        chosen.append(position)
+        uncovered.difference_update(seen)
+
+    # serpentine over bands of two scan radii, then the same 2-opt pass as for the lattice
+    rows = {}
+    for x, y in chosen:
+        rows.setdefault(int(math.floor(y / (2 * r))), []).append((x, y))
+    rows = [sorted(rows[band]) for band in sorted(rows)]
+
+    if start is not None:
+        start = projection.to_xy(*start)
+    path = _order(rows, start)
+
+    distance = sum(_dist(a, b) for a, b in zip(path, path[1:]))
+    if start is not None and path:
+        distance += _dist(start, path[0])
+
+    coverage = 1.0 - float(len(uncovered)) / len(points)
+    plan = ScanPlan([projection.to_latlng(x, y) for x, y in path], scan_radius, 0.0, coverage, distance)
+    log.debug('Spawn scan plan for %s spawns: %s', len(points), plan)
+    return plan
+
+def circle_coverage(points, lat, lng, radius, scan_radius=DEFAULT_SCAN_RADIUS):
+    """Coverage ratio of arbitrary scan positions on the circle around lat/lng, e.g. to compare other planners."""
+    projection = _Projection(lat, lng)
+    return _coverage([projection.to_xy(*p) for p in points], _Circle(0.0, 0.0, radius), scan_radius)
+
+def _plan(projection, region, scan_radius, start):
+    if scan_radius <= 0:
+        raise ValueError('scan_radius has to be positive')
+
+    best = None
+    for ox in range(OFFSET_STEPS):
+        for oy in range(OFFSET_STEPS):
+            rows = _hex_lattice(region, scan_radius,
+                                SQRT3 * scan_radius * ox / OFFSET_STEPS, 3 * scan_radius * oy / OFFSET_STEPS)
+            count = sum(len(row) for row in rows)
+            if best is None or count < best[0]:
+                best = (count, rows)
+
+    if start is not None:
+        start = projection.to_xy(*start)
+    path = _order(best[1], start)
+
+    distance = sum(_dist(a, b) for a, b in zip(path, path[1:]))
+    if start is not None and path:
+        distance += _dist(start, path[0])
+
+    points = [projection.to_latlng(x, y) for x, y in path]
+    plan = ScanPlan(points, scan_radius, region.area(), _coverage(path, region, scan_radius), distance)
+    log.debug('Scan plan: %s', plan)
+    return plan
+
+def _hex_lattice(region, r, ox, oy):
+    # pointy-top hexagons with circumradius r: each hexagon lies inside the scan disk of its center
+    min_x, min_y, max_x, max_y = region.bounds()
+    dx = SQRT3 * r
+    dy = 1.5 * r
+
+    rows = []
+    k = int(math.floor((min_y - r - oy) / dy))
+    while oy + k * dy <= max_y + r:
+        y = oy + k * dy
+        shift = ox + (dx / 2 if k % 2 else 0.0)
+        row = []
+        m = int(math.floor((min_x - r - shift) / dx))
+        while shift + m * dx <= max_x + r:
+            x = shift + m * dx
+            if region.intersects_hexagon(x, y, r):
+                row.append((x, y))
+            m += 1
+        if row:
+            rows.append(row)
+        k += 1
+    return rows
+
+def _order(rows, start):
+    # serpentine over the rows, then a windowed 2-opt to remove the jumps at gaps of concave areas
+    path = []
+    for i, row in enumerate(rows):
+        path.extend(row if i % 2 == 0 else reversed(row))
+
+    # only moves which shorten the edge leaving path[i] are tried (neighbour list pruning)
+    hypot = math.hypot
+    improved = True
+    passes = 0
+    while improved and passes < OPTIMIZE_PASSES:
+        improved = False
+        passes += 1
+        n = len(path)
+        for i in range(n - 2):
+            ax, ay = path[i]
+            bx, by = path[i + 1]
+            ab = hypot(ax - bx, ay - by)
+            for j in range(i + 2, min(n, i + 2 + OPTIMIZE_WINDOW)):
+                cx, cy = path[j]
+                ac = hypot(ax - cx, ay - cy)
+                if ac >= ab:
+                    continue
+                if j + 1 < n:
+                    dx, dy = path[j + 1]
+                    delta = ac + hypot(bx - dx, by - dy) - ab - hypot(cx - dx, cy - dy)
+                else:
+                    delta = ac - ab
+                if delta < -1e-9:
+                    path[i + 1:j + 1] = reversed(path[i + 1:j + 1])
+                    improved = True
+                    break
+
+    if start is not None and len(path) > 1 and _dist(start, path[-1]) < _dist(start, path[0]):
+        path.reverse()
+    return path
+
+def _coverage(path, region, r, samples=4000):
+    """Fraction of sample points of the region within r of a scan position."""
+    area = region.area()
+    if not area:
+        return 1.0
+
+    buckets = {}
+    for x, y in path:
+        buckets.setdefault((int(math.floor(x / r)), int(math.floor(y / r))), []).append((x, y))
+
+    min_x, min_y, max_x, max_y = region.bounds()
+    step = math.sqrt(area / samples)
+    r2 = r * r
+    total = covered = 0
+    y = min_y + step / 2
+    while y < max_y:
+        x = min_x + step / 2
+        while x < max_x:
+            if region.contains(x, y):
+                total += 1
+                bx, by = int(math.floor(x / r)), int(math.floor(y / r))
+                if any((px - x) ** 2 + (py - y) ** 2 <= r2
+                       for i in (-1, 0, 1) for j in (-1, 0, 1)
+                       for px, py in buckets.get((bx + i, by + j), ())):
+                    covered += 1
+            x += step
+        y += step
+    return float(covered) / total if total else 1.0
+
+def _dist(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+def _hexagon(x, y, r):
+    h = SQRT3 / 2 * r
+    return [(x + h, y + r / 2), (x, y + r), (x - h, y + r / 2), (x - h, y - r / 2), (x, y - r), (x + h, y - r / 2)]
+
+
+class _Projection:
+    """Equirectangular projection to metres around a reference point, good enough for city sized areas."""
+
+    def __init__(self, lat, lng):
+        self.lat = lat
+        self.lng = lng
+        self.scale_y = math.radians(1) * EARTH_RADIUS
+        self.scale_x = self.scale_y * math.cos(math.radians(lat))
+
+    def to_xy(self, lat, lng):
+        return (lng - self.lng) * self.scale_x, (lat - self.lat) * self.scale_y
+
+    def to_latlng(self, x, y):
+        return self.lat + y / self.scale_y, self.lng + x / self.scale_x
+
+
+class _Circle:
+
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+
+    def area(self):
+        return math.pi * self.radius ** 2
+
+    def bounds(self):
+        return self.x - self.radius, self.y - self.radius, self.x + self.radius, self.y + self.radius
+
+    def contains(self, x, y):
+        return (x - self.x) ** 2 + (y - self.y) ** 2 <= self.radius ** 2
+
+    def intersects_hexagon(self, x, y, r):
+        d = math.hypot(x - self.x, y - self.y)
+        if d > self.radius + r:
+            return False
+        if d <= self.radius + SQRT3 / 2 * r:
+            return True
+        # between inradius and circumradius: distance from the circle center to the hexagon edges
+        vertices = _hexagon(x, y, r)
+        return any(_segment_distance((self.x, self.y), a, b) <= self.radius
+                   for a, b in zip(vertices, vertices[1:] + vertices[:1]))
+
+
+class _Polygon:
+
+    def __init__(self, vertices):
+        self.vertices = vertices
+        self.edges = list(zip(vertices, vertices[1:] + vertices[:1]))
+        xs = [v[0] for v in vertices]
+        ys = [v[1] for v in vertices]
+        self._bounds = min(xs), min(ys), max(xs), max(ys)
+
+    def area(self):
+        return abs(sum(a[0] * b[1] - b[0] * a[1] for a, b in self.edges)) / 2
+
+    def bounds(self):
+        return self._bounds
+
+    def contains(self, x, y):
+        return point_in_polygon((x, y), self.vertices)
+
+    def intersects_hexagon(self, x, y, r):
+        min_x, min_y, max_x, max_y = self._bounds
+        if x + r < min_x or x - r > max_x or y + r < min_y or y - r > max_y:
+            return False
+        hexagon = _hexagon(x, y, r)
+        if any(point_in_polygon(v, self.vertices) for v in hexagon):
+            return True
+        if any(point_in_polygon(v, hexagon) for v in self.vertices):
+            return True
+        hex_edges = list(zip(hexagon, hexagon[1:] + hexagon[:1]))
+        return any(segments_intersect(a, b, c, d) for a, b in self.edges for c, d in hex_edges)
+
+
+def _segment_distance(p, a, b):
+    ax, ay = b[0] - a[0], b[1] - a[1]
+    length = ax * ax + ay * ay
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * ax + (p[1] - a[1]) * ay) / length))
+    return math.hypot(a[0] + t * ax - p[0], a[1] + t * ay - p[1])
@@ -0,0 +1,126 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit for the number of RPCs in flight.
+
+    Every healthy response (HTTP 200 within `latency_threshold` seconds) of an
+    RPC sent while the limit was used up grows the limit by `increase` per
+    window of `limit` responses, so a lightly loaded client does not drift to
+    `max_limit`. A busy/offline
+    server, a timeout, a non-200 response or a slow response cuts the limit by
+    the factor `decrease`. Responses to RPCs which were already in flight when the limit
+    was cut do not cut it again, so one overload burst costs one decrease.
+
+    One limiter can be shared by several PGoApi instances:
+
+        limiter = AdaptiveLimiter()
+        api.set_limiter(limiter)
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64, increase=1.0, decrease=0.5, latency_threshold=2.0):
+
+        self.log = logging.getLogger(__name__)
+
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_threshold = latency_threshold
+
+        self._condition = threading.Condition()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._last_decrease = 0
+
+        self._metrics = {
+            'increases': 0,
+            'decreases': 0,
+            'outcomes': {},
+            'last_decision': None,
+            'last_latency': None,
+        }
+
+    def get_limit(self):
+        return max(self._min_limit, int(self._limit))
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._in_flight >= self.get_limit():
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            self._in_flight += 1
+            return time.time()
+
+    def release(self, started, outcome, latency=None):
+        with self._condition:
+            # only a limit which is used up can tell whether more concurrency would be fine
+            saturated = self._in_flight >= self.get_limit()
+            self._in_flight -= 1
+
+            outcomes = self._metrics['outcomes']
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            self._metrics['last_latency'] = latency
+
+            healthy = outcome == 'ok' and (latency is None or latency <= self._latency_threshold)
+            if healthy:
+                if saturated:
+                    self._limit = min(self._max_limit, self._limit + self._increase / self._limit)
+                    self._metrics['increases'] += 1
+                    self._metrics['last_decision'] = 'increase'
+                else:
+                    self._metrics['last_decision'] = 'hold'
+            elif started >= self._last_decrease:
+                self._limit = max(self._min_limit, self._limit * self._decrease)
+                self._last_decrease = time.time()
+                self._metrics['decreases'] += 1
+                self._metrics['last_decision'] = 'decrease'
+                self.log.info('Concurrency limit cut to %s (%s)', self.get_limit(), outcome)
+            else:
+                self._metrics['last_decision'] = 'hold'
+
+            self._condition.notify_all()
+
+    def get_metrics(self):
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics['outcomes'] = dict(self._metrics['outcomes'])
+            metrics['limit'] = self.get_limit()
+            metrics['in_flight'] = self._in_flight
+            return metrics
@@ -0,0 +1,282 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+
+from pgoapi.cells import CELL_LEVEL, cover_circle, cover_rect
+from pgoapi.ttl import TTLIndex
+from pgoapi.mapsync import map_cells, despawn_time_ms
+from pgoapi.utilities import distance
+
+
+class Fort:
+    __slots__ = ('id', 'cell_id', 'latitude', 'longitude', 'type', 'enabled', 'team', 'last_modified_ms')
+
+
+class SpawnPoint:
+    __slots__ = ('id', 'cell_id', 'latitude', 'longitude', 'last_seen_ms')
+
+
+class Pokemon:
+    __slots__ = ('encounter_id', 'cell_id', 'spawnpoint_id', 'pokemon_id', 'latitude', 'longitude',
+                 'expires_ms', 'last_seen_ms')
+
+
+class NearbyPokemon:
+    __slots__ = ('encounter_id', 'cell_id', 'pokemon_id', 'distance', 'expires_ms', 'last_seen_ms')
+
+
+class _Cell:
+    __slots__ = ('forts', 'spawn_points', 'pokemons', 'nearby_pokemons', 'timestamp_ms')
+
+    def __init__(self):
+        self.forts = set()
+        self.spawn_points = set()
+        self.pokemons = set()
+        self.nearby_pokemons = set()
+        self.timestamp_ms = 0
+
+
+class MapStore:
+
+    """
+    In-memory map state built from GET_MAP_OBJECTS map cells.
+
+    Forts, spawn points, wild/catchable pokemon (merged into one record per
+    encounter) and nearby pokemon are kept as __slots__ records, indexed by
+    id and by S2 cell. Radius and bounding box queries only look at the
+    cells covering the queried area. Pokemon are evicted by their despawn
+    time over a TTLIndex, so a sweep costs O(log n) per evicted record.
+    Pokemon without a usable despawn time are kept for default_ttl seconds,
+    nearby pokemon carry no despawn time and are kept for nearby_ttl seconds.
+
+    The store can be used as state of a MapSync:
+
+        store = MapStore()
+        sync = MapSync(store)
+    """
+
+    FORTS = 'forts'
+    SPAWN_POINTS = 'spawn_points'
+    POKEMONS = 'pokemons'
+
+    def __init__(self, level=CELL_LEVEL, nearby_ttl=300, default_ttl=900, clock=time.time):
+        self.log = logging.getLogger(__name__)
+
+        self._level = level
+        self._nearby_ttl_ms = int(nearby_ttl * 1000)
+        self._default_ttl_ms = int(default_ttl * 1000)
+        self._clock = clock
+
+        self.cells = {}
+        self.forts = {}
+        self.spawn_points = {}
+        self.pokemons = {}
+        self.nearby_pokemons = {}
+
+        # (nearby, encounter_id) by despawn time in ms
+        self._expiry = TTLIndex()
+
+    def __len__(self):
+        return len(self.forts) + len(self.spawn_points) + len(self.pokemons) + len(self.nearby_pokemons)
+
+    def ingest(self, response):
+        """Applies the map cells of a response (see mapsync.map_cells), returns their number."""
+        cells = map_cells(response)
+        for map_cell in cells:
+            self.apply_cell(map_cell)
+        return len(cells)
+
+    def apply_cell(self, map_cell):
+        cell_id = map_cell['s2_cell_id']
+        cell = self.cells.get(cell_id)
+        if cell is None:
+            cell = self.cells[cell_id] = _Cell()
+
+        now_ms = map_cell.get('current_timestamp_ms') or int(self._clock() * 1000)
+        cell.timestamp_ms = now_ms
+
+        for data in map_cell.get('forts', []):
+            self._add_fort(cell, cell_id, data)
+        for data in map_cell.get('spawn_points', []):
+            self._add_spawn_point(cell, cell_id, data, now_ms)
+
+        for data in map_cell.get('wild_pokemons', []):
+            expires_ms = despawn_time_ms(now_ms, data.get('time_till_hidden_ms', 0))
+            self._add_pokemon(cell, cell_id, data['encounter_id'], data.get('spawnpoint_id'),
+                              data.get('pokemon_data', {}).get('pokemon_id', 0),
+                              data['latitude'], data['longitude'], expires_ms, now_ms)
+        for data in map_cell.get('catchable_pokemons', []):
+            expires_ms = data.get('expiration_timestamp_ms') or None
+            self._add_pokemon(cell, cell_id, data['encounter_id'], data.get('spawnpoint_id'), data.get('pokemon_id', 0),
+                              data['latitude'], data['longitude'], expires_ms, now_ms)
+        for data in map_cell.get('nearby_pokemons', []):
+            self._add_nearby(cell, cell_id, data, now_ms)
+
+        for object_id in map_cell.get('deleted_objects', []):
+            self.delete(object_id)
+
+    def delete(self, object_id):
+        """Removes a fort or pokemon, object_id is a fort id or an encounter id (also as string)."""
+        fort = self.forts.pop(object_id, None)
+        if fort is not None:
+            self.cells[fort.cell_id].forts.discard(object_id)
+            return True
+
+        try:
+            encounter_id = int(object_id)
+        except ValueError:
+            return False
+
+        deleted = False
+        pokemon = self.pokemons.pop(encounter_id, None)
+        if pokemon is not None:
+            self.cells[pokemon.cell_id].pokemons.discard(encounter_id)
+            self._expiry.pop((False, encounter_id))
+            deleted = True
+        nearby = self.nearby_pokemons.pop(encounter_id, None)
+        if nearby is not None:
+            self.cells[nearby.cell_id].nearby_pokemons.discard(encounter_id)
+            self._expiry.pop((True, encounter_id))
+            deleted = True
+        return deleted
+
+    def expire(self, now=None):
+        """Evicts all pokemon which despawned before now, returns their number."""
+        if now is None:
+            now = self._clock()
+        now_ms = int(now * 1000)
+
+        expired = self._expiry.expire(now_ms)
+        for (nearby, encounter_id), _ in expired:
+            record = (self.nearby_pokemons if nearby else self.pokemons).pop(encounter_id, None)
+            if record is not None:
+                cell = self.cells[record.cell_id]
+                (cell.nearby_pokemons if nearby else cell.pokemons).discard(encounter_id)
+
+        if expired:
+            self.log.debug('Expired %s pokemon', len(expired))
+        return len(expired)
+
+    def in_cell(self, cell_id, kind=POKEMONS):
+        cell = self.cells.get(cell_id)
+        if cell is None:
+            return []
+        records = getattr(self, kind)
+        return [records[key] for key in getattr(cell, kind)]
+
+    def query_radius(self, lat, lng, radius, kind=POKEMONS):
+        """Records of kind (forts, spawn_points or pokemons) within radius metres of lat/lng."""
+        return [record for record in self._candidates(cover_circle(lat, lng, radius, self._level), kind)
+                if distance(lat, lng, record.latitude, record.longitude) <= radius]
+
+    def query_bbox(self, lat1, lng1, lat2, lng2, kind=POKEMONS):
+        """Records of kind (forts, spawn_points or pokemons) within the lat/lng rectangle."""
+        min_lat, max_lat = min(lat1, lat2), max(lat1, lat2)
+        min_lng, max_lng = min(lng1, lng2), max(lng1, lng2)
+        return [record for record in self._candidates(cover_rect(lat1, lng1, lat2, lng2, self._level), kind)
+                if min_lat <= record.latitude <= max_lat and min_lng <= record.longitude <= max_lng]
+
+    def _candidates(self, cell_ids, kind):
+        records = getattr(self, kind)
+        for cell_id in cell_ids:
+            cell = self.cells.get(cell_id)
+            if cell is not None:
+                for key in getattr(cell, kind):
+                    yield records[key]
+
+    def _move(self, record, cell_id, kind, key):
+        # keeps the cell index in sync when a record shows up in another cell
+        if record.cell_id != cell_id:
+            getattr(self.cells[record.cell_id], kind).discard(key)
+            record.cell_id = cell_id
+
+    def _add_fort(self, cell, cell_id, data):
+        fort = self.forts.get(data['id'])
+        if fort is None:
+            fort = self.forts[data['id']] = Fort()
+            fort.id = data['id']
+        else:
+            self._move(fort, cell_id, self.FORTS, fort.id)
+        fort.cell_id = cell_id
+        fort.latitude = data['latitude']
+        fort.longitude = data['longitude']
+        fort.type = data.get('type', 0)
+        fort.enabled = data.get('enabled', False)
+        fort.team = data.get('owned_by_team', 0)
+        fort.last_modified_ms = data.get('last_modified_timestamp_ms', 0)
+        cell.forts.add(fort.id)
+
+    def _add_spawn_point(self, cell, cell_id, data, now_ms):
+        key = (data['latitude'], data['longitude'])
+        spawn_point = self.spawn_points.get(key)
+        if spawn_point is None:
+            spawn_point = self.spawn_points[key] = SpawnPoint()
+            spawn_point.id = key
+            spawn_point.cell_id = cell_id
+            spawn_point.latitude, spawn_point.longitude = key
+            cell.spawn_points.add(key)
+        spawn_point.last_seen_ms = now_ms
+
+    def _add_pokemon(self, cell, cell_id, encounter_id, spawnpoint_id, pokemon_id, latitude, longitude, expires_ms, now_ms):
+        pokemon = self.pokemons.get(encounter_id)
+        if pokemon is None:
+            pokemon = self.pokemons[encounter_id] = Pokemon()
+            pokemon.encounter_id = encounter_id
+            pokemon.expires_ms = None
+        else:
+            self._move(pokemon, cell_id, self.POKEMONS, encounter_id)
+        pokemon.cell_id = cell_id
+        cell.pokemons.add(encounter_id)
+        pokemon.spawnpoint_id = spawnpoint_id
+        pokemon.pokemon_id = pokemon_id
+        pokemon.latitude = latitude
+        pokemon.longitude = longitude
+        pokemon.last_seen_ms = now_ms
+        if expires_ms is None:
+            # keep a known despawn time of an earlier sighting
+            expires_ms = pokemon.expires_ms or now_ms + self._default_ttl_ms
+        if expires_ms != pokemon.expires_ms:
+            pokemon.expires_ms = expires_ms
+            self._expiry.set((False, encounter_id), None, expires_ms)
+
+    def _add_nearby(self, cell, cell_id, data, now_ms):
+        encounter_id = data['encounter_id']
+        nearby = self.nearby_pokemons.get(encounter_id)
+        if nearby is None:
+            nearby = self.nearby_pokemons[encounter_id] = NearbyPokemon()
+            nearby.encounter_id = encounter_id
+        else:
+            self._move(nearby, cell_id, 'nearby_pokemons', encounter_id)
+        nearby.cell_id = cell_id
+        cell.nearby_pokemons.add(encounter_id)
+        nearby.pokemon_id = data.get('pokemon_id', 0)
+        nearby.distance = data.get('distance_in_meters', 0.0)
+        nearby.last_seen_ms = now_ms
+        nearby.expires_ms = now_ms + self._nearby_ttl_ms
+        self._expiry.set((True, encounter_id), None, nearby.expires_ms)
@@ -0,0 +1,186 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+
+log = logging.getLogger(__name__)
+
+# despawn times outside of this range are bogus (the server sends negative or huge time_till_hidden_ms)
+MAX_TIME_TILL_HIDDEN_MS = 3600 * 1000
+
+
+def map_cells(response):
+    """
+    The map cells of a response dict of call/execute (or only its GET_MAP_OBJECTS part).
+    A missing or unparsable GET_MAP_OBJECTS response or a status other than 1 gives no cells.
+    """
+    if not response:
+        return []
+    if 'responses' in response:
+        response = response['responses'].get('GET_MAP_OBJECTS')
+    if not isinstance(response, dict):
+        log.debug('GET_MAP_OBJECTS response missing or not parsed: %s', response)
+        return []
+    if response.get('status') != 1:
+        log.debug('GET_MAP_OBJECTS status %s - no map cells', response.get('status'))
+        return []
+    return response.get('map_cells', [])
+
+def despawn_time_ms(now_ms, time_till_hidden_ms):
+    """Despawn time of a wild pokemon seen at now_ms, None if its time_till_hidden_ms is not usable."""
+    if 0 < time_till_hidden_ms <= MAX_TIME_TILL_HIDDEN_MS:
+        return now_ms + time_till_hidden_ms
+    return None
+
+def request_map_objects(batch, cell_ids, since_timestamp_ms=None):
+    """Adds a GET_MAP_OBJECTS subrequest for cell_ids at the position of batch, without timestamps the full cells are fetched."""
+    latitude, longitude, _ = batch.get_position()
+    if since_timestamp_ms is None:
+        since_timestamp_ms = [0] * len(cell_ids)
+    return batch.get_map_objects(latitude=latitude, longitude=longitude,
+                                 since_timestamp_ms=since_timestamp_ms, cell_id=cell_ids)
+
+def scan_cells(api, lat, lng, cell_ids, since_timestamp_ms=None):
+    """Executes one GET_MAP_OBJECTS request for cell_ids at lat/lng, returns the response dict."""
+    batch = api.batch(lat, lng, 0)
+    request_map_objects(batch, cell_ids, since_timestamp_ms)
+    return batch.execute()
+
+
+class MapSync:
+
+    """
+    Incremental GET_MAP_OBJECTS for one account.
+
+    Remembers the current_timestamp_ms of every map cell and sends it as
+    since_timestamp_ms of the next request for that cell, so the server only
+    returns what changed in between. The map cells of the responses are
+    applied to a local map state, including the deleted_objects:
+
+        sync = MapSync()
+        response = sync.scan(api, lat, lng, cell_ids)
+        sync.state.pokemons()
+    """
+
+    def __init__(self, state=None):
+        self.log = logging.getLogger(__name__)
+
+        self.state = state if state is not None else MapState()
+        self._timestamps = {}
+
+    def get_timestamps(self, cell_ids):
+        return [self._timestamps.get(cell_id, 0) for cell_id in cell_ids]
+
+    def reset(self, cell_ids=None):
+        """Forgets the timestamps, the next requests for these cells (default: all) fetch the full content."""
+        if cell_ids is None:
+            self._timestamps.clear()
+        else:
+            for cell_id in cell_ids:
+                self._timestamps.pop(cell_id, None)
+
+    def request(self, batch, cell_ids):
+        """Adds a GET_MAP_OBJECTS subrequest for cell_ids at the position of batch (a RequestBatch or PGoApi)."""
+        return request_map_objects(batch, cell_ids, self.get_timestamps(cell_ids))
+
+    def scan(self, api, lat, lng, cell_ids):
+        response = scan_cells(api, lat, lng, cell_ids, self.get_timestamps(cell_ids))
+        self.apply(response)
+        return response
+
+    def apply(self, response):
+        """Applies the map cells of a response (see map_cells) to the state, returns their number."""
+        cells = map_cells(response)
+        for map_cell in cells:
+            self.state.apply_cell(map_cell)
+            # a truncated cell is missing objects, so it has to be requested from the old timestamp again
+            if not map_cell.get('is_truncated_list'):
+                self._timestamps[map_cell['s2_cell_id']] = map_cell.get('current_timestamp_ms', 0)
+        return len(cells)
+
+
+class MapState:
+
+    """
+    Minimal local map state: the latest objects per cell, keyed by their ids.
+
+    Any object with an apply_cell(map_cell) method can be used as state of a MapSync instead.
+    """
+
+    def __init__(self):
+        self.cells = {}
+
+    def apply_cell(self, map_cell):
+        cell = self.cells.get(map_cell['s2_cell_id'])
+        if cell is None:
+            cell = self.cells[map_cell['s2_cell_id']] = _CellState()
+
+        for fort in map_cell.get('forts', []):
+            cell.forts[fort['id']] = fort
+        for spawn_point in map_cell.get('spawn_points', []):
+            cell.spawn_points[(spawn_point['latitude'], spawn_point['longitude'])] = spawn_point
+        for pokemon in map_cell.get('wild_pokemons', []):
+            cell.wild_pokemons[pokemon['encounter_id']] = pokemon
+        for pokemon in map_cell.get('catchable_pokemons', []):
+            cell.catchable_pokemons[pokemon['encounter_id']] = pokemon
+        # nearby pokemon are always sent complete
+        cell.nearby_pokemons = map_cell.get('nearby_pokemons', [])
+
+        for object_id in map_cell.get('deleted_objects', []):
+            cell.delete(object_id)
+
+        cell.timestamp_ms = map_cell.get('current_timestamp_ms', 0)
+
+    def forts(self):
+        return [fort for cell in self.cells.values() for fort in cell.forts.values()]
+
+    def spawn_points(self):
+        return [spawn_point for cell in self.cells.values() for spawn_point in cell.spawn_points.values()]
+
+    def pokemons(self):
+        return [pokemon for cell in self.cells.values() for pokemon in cell.wild_pokemons.values()]
+
+
+class _CellState:
+
+    def __init__(self):
+        self.timestamp_ms = 0
+        self.forts = {}
+        self.spawn_points = {}
+        self.wild_pokemons = {}
+        self.catchable_pokemons = {}
+        self.nearby_pokemons = []
+
+    def delete(self, object_id):
+        # deleted_objects are strings, encounter ids are integers
+        self.forts.pop(object_id, None)
+        try:
+            encounter_id = int(object_id)
+        except ValueError:
+            return
+        self.wild_pokemons.pop(encounter_id, None)
+        self.catchable_pokemons.pop(encounter_id, None)
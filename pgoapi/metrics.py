@@ -0,0 +1,197 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import json
+import threading
+
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Thread safe registry of counters and histograms.
+
+    Labels are given as tuple of (name, value) pairs. update() applies several
+    increments and observations under one lock. Hot paths can also look up
+    their Counter and Histogram objects once with counter()/histogram() and
+    update them directly while holding `lock`. The content can be exported in
+    the Prometheus text format or as JSON:
+
+        metrics = MetricsRegistry()
+        api.set_metrics(metrics)
+        ...
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        self._help = {}
+        self._buckets = {}
+        self._counters = {}
+        self._histograms = {}
+
+    def describe(self, name, help_text, buckets=None):
+        self._help[name] = help_text
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def counter(self, name, labels=()):
+        with self.lock:
+            return self._counter((name, labels))
+
+    def histogram(self, name, labels=()):
+        with self.lock:
+            return self._histogram((name, labels))
+
+    def inc(self, name, labels=(), value=1):
+        self.update(increments=((name, labels, value),))
+
+    def observe(self, name, value, labels=()):
+        self.update(observations=((name, labels, value),))
+
+    def update(self, increments=(), observations=()):
+        with self.lock:
+            for name, labels, value in increments:
+                self._counter((name, labels)).value += value
+            for name, labels, value in observations:
+                self._histogram((name, labels)).observe(value)
+
+    def get_counter(self, name, labels=()):
+        with self.lock:
+            counter = self._counters.get((name, labels))
+            return counter.value if counter is not None else 0
+
+    def reset(self):
+        # zeroed in place, so Counter and Histogram objects held by callers stay registered
+        with self.lock:
+            for counter in self._counters.values():
+                counter.value = 0
+            for histogram in self._histograms.values():
+                histogram.counts = [0] * len(histogram.counts)
+                histogram.sum = 0
+
+    def _counter(self, key):
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = Counter()
+        return counter
+
+    def _histogram(self, key):
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(self._buckets.get(key[0], LATENCY_BUCKETS))
+        return histogram
+
+    def to_dict(self):
+        with self.lock:
+            counters = {}
+            for (name, labels), counter in self._counters.items():
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': counter.value})
+
+            histograms = {}
+            for (name, labels), histogram in self._histograms.items():
+                histograms.setdefault(name, []).append({
+                    'labels': dict(labels),
+                    'buckets': list(histogram.buckets),
+                    'counts': list(histogram.counts),
+                    'sum': histogram.sum,
+                    'count': histogram.count,
+                })
+
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self):
+        with self.lock:
+            counters = sorted((key, counter.value) for key, counter in self._counters.items())
+            histograms = sorted((key, (histogram.buckets, list(histogram.counts), histogram.sum, histogram.count))
+                                for key, histogram in self._histograms.items())
+
+        lines = []
+        last_name = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                self._add_header(lines, name, 'counter')
+                last_name = name
+            lines.append('{}{} {}'.format(name, _format_labels(labels), value))
+
+        last_name = None
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            if name != last_name:
+                self._add_header(lines, name, 'histogram')
+                last_name = name
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append('{}_bucket{} {}'.format(name, _format_labels(labels + (('le', repr(float(bound))),)), cumulative))
+            lines.append('{}_bucket{} {}'.format(name, _format_labels(labels + (('le', '+Inf'),)), count))
+            lines.append('{}_sum{} {}'.format(name, _format_labels(labels), total))
+            lines.append('{}_count{} {}'.format(name, _format_labels(labels), count))
+
+        return '\n'.join(lines) + '\n'
+
+    def _add_header(self, lines, name, metric_type):
+        if name in self._help:
+            lines.append('# HELP {} {}'.format(name, self._help[name]))
+        lines.append('# TYPE {} {}'.format(name, metric_type))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"')) for key, value in labels) + '}'
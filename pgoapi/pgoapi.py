@@ -31,10 +31,11 @@ import requests
 import six
 
 from .utilities import f2i, h2f
-from pgoapi.rpc_api import RpcApi
+from pgoapi.rpc_api import RpcApi, add_hook, remove_hook
+from pgoapi.auth import Auth
 from pgoapi.auth_ptc import AuthPtc
 from pgoapi.auth_google import AuthGoogle
-from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException
+from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException, CircuitOpenException
 
 from . import protos
 from POGOProtos.Networking.Requests_pb2 import RequestType
@@ -44,6 +45,7 @@ logger = logging.getLogger(__name__)
 class PGoApi:
 
     API_ENTRY = 'https://pgorelease.nianticlabs.com/plfe/rpc'
+    RPC_TIMEOUT = 30
 
     def __init__(self):
 
@@ -51,6 +53,11 @@ class PGoApi:
 
         self._auth_provider = None
         self._api_endpoint = None
+        self._limiter = None
+        self._breakers = None
+        self._metrics = None
+        self._hooks = {}
+        self._timeout = self.RPC_TIMEOUT
 
         self._position_lat = 0
         self._position_lng = 0
@@ -58,17 +65,30 @@ class PGoApi:
 
         self._req_method_list = []
 
+    def batch(self, lat=None, lng=None, alt=0):
+        batch = RequestBatch(self)
+        if lat is not None and lng is not None:
+            batch.set_position(lat, lng, alt)
+        return batch
+
     def call(self):
         if not self._req_method_list:
             return False
 
+        response = self._call(self._req_method_list, self.get_position())
+
+        # cleanup after call execution
+        self.log.info('Cleanup of request!')
+        self._req_method_list = []
+
+        return response
+
+    def _call(self, req_method_list, player_position):
         if self._auth_provider is None or not self._auth_provider.is_login():
             self.log.info('Not logged in')
             return False
 
-        player_position = self.get_position()
-
-        request = RpcApi(self._auth_provider)
+        request = RpcApi(self._auth_provider, self._limiter, self._breakers, self._metrics, self._hooks, self._timeout)
 
         if self._api_endpoint:
             api_endpoint = self._api_endpoint
@@ -78,13 +98,15 @@ class PGoApi:
         self.log.info('Execution of RPC')
         response = None
         try:
-            response = request.request(api_endpoint, self._req_method_list, player_position)
+            response = request.request(api_endpoint, req_method_list, player_position)
+        except CircuitOpenException as e:
+            self.log.info('Server was busy or offline recently - RPC skipped, try again later!')
         except ServerBusyOrOfflineException as e:
             self.log.info('Server seems to be busy or offline - try again!')
 
-        # cleanup after call execution
-        self.log.info('Cleanup of request!')
-        self._req_method_list = []
+        if request.get_api_endpoint():
+            self._api_endpoint = request.get_api_endpoint()
+            self.log.debug('Setting API endpoint to: %s', self._api_endpoint)
 
         return response
 
@@ -95,6 +117,46 @@ class PGoApi:
     def set_logger(self, logger):
         self._ = logger or logging.getLogger(__name__)
 
+    def get_api_endpoint(self):
+        return self._api_endpoint
+
+    def set_api_endpoint(self, api_endpoint):
+        self._api_endpoint = api_endpoint
+
+    def set_timeout(self, timeout):
+        """Seconds to wait for the server per RPC (None waits forever)."""
+        self._timeout = timeout
+
+    def set_limiter(self, limiter):
+        self._limiter = limiter
+
+    def set_breakers(self, breakers):
+        self._breakers = breakers
+
+    def set_metrics(self, metrics):
+        if metrics is not None:
+            RpcApi.describe_metrics(metrics)
+        self._metrics = metrics
+
+    def add_hook(self, event, callback):
+        """
+        Registers a callback for one of the RpcApi.HOOKS events. Every callback
+        gets a dictionary describing the current RPC, which fills up over the
+        course of the call:
+
+            before_build    subrequests, player_position
+            before_send     + endpoint, request_bytes
+            after_receive   + status_code, response_bytes
+            after_parse     + response
+
+        A before_build callback can set 'response' to answer the call without
+        an RPC, an after_parse callback can replace it.
+        """
+        add_hook(self._hooks, event, callback)
+
+    def remove_hook(self, event, callback):
+        remove_hook(self._hooks, event, callback)
+
     def get_position(self):
         return (self._position_lat, self._position_lng, self._position_alt)
 
@@ -106,24 +168,8 @@ class PGoApi:
         self._position_alt = f2i(alt)
 
     def __getattr__(self, func):
-        def function(**kwargs):
-
-            if not self._req_method_list:
-                self.log.info('Create new request...')
-
-            name = func.upper()
-            if kwargs:
-                self._req_method_list.append( { RequestType.Value(name): kwargs } )
-                self.log.info("Adding '%s' to RPC request including arguments", name)
-                self.log.debug("Arguments of '%s': \n\r%s", name, kwargs)
-            else:
-                self._req_method_list.append( RequestType.Value(name) )
-                self.log.info("Adding '%s' to RPC request", name)
-
-            return self
-
         if func.upper() in RequestType.keys():
-            return function
+            return _subrequest_adder(self, self._req_method_list, func)
         else:
             raise AttributeError
 
@@ -133,7 +179,9 @@ class PGoApi:
         if not isinstance(username, six.string_types) or not isinstance(password, six.string_types):
             raise AuthException("Username/password not correctly specified")
 
-        if provider == 'ptc':
+        if isinstance(provider, Auth):
+            self._auth_provider = provider
+        elif provider == 'ptc':
             self._auth_provider = AuthPtc()
         elif provider == 'google':
             self._auth_provider = AuthGoogle()
@@ -164,7 +212,8 @@ class PGoApi:
         if 'api_url' in response:
             self._api_endpoint = ('https://{}/rpc'.format(response['api_url']))
             self.log.debug('Setting API endpoint to: %s', self._api_endpoint)
-        else:
+        elif not self._api_endpoint or response.get('status_code') != 1:
+            # without api_url only a successful answer on an already known endpoint (e.g. a stand-in server) counts
             self.log.error('Login failed - unexpected server response!')
             return False
 
@@ -175,3 +224,80 @@ class PGoApi:
         self.log.info('Login process completed')
 
         return True
+
+
+class RequestBatch:
+    """
+    A chain of subrequests which is executed as one RPC over the session of
+    a logged in PGoApi instance.
+
+    Every batch carries its own subrequest list, so several threads can share
+    one authenticated PGoApi as long as each of them uses its own batch:
+
+        api.batch().get_player().get_inventory().execute()
+
+    A batch can also carry its own player position, which takes precedence
+    over the position of the PGoApi instance:
+
+        api.batch(lat, lng).get_map_objects(...).execute()
+    """
+
+    def __init__(self, api):
+
+        self.log = logging.getLogger(__name__)
+
+        self._api = api
+
+        self._position = None
+
+        self._req_method_list = []
+
+    def execute(self):
+        if not self._req_method_list:
+            return False
+
+        return self._api._call(self._req_method_list, self.get_position())
+
+    def call(self):
+        return self.execute()
+
+    def get_position(self):
+        if self._position is None:
+            return self._api.get_position()
+        return self._position
+
+    def set_position(self, lat, lng, alt):
+        self.log.debug('Set batch position - Lat: %s Long: %s Alt: %s', lat, lng, alt)
+
+        self._position = (f2i(lat), f2i(lng), f2i(alt))
+        return self
+
+    def list_curr_methods(self):
+        for i in self._req_method_list:
+            print("{} ({})".format(RequestType.Name(i),i))
+
+    def __getattr__(self, func):
+        if func.upper() in RequestType.keys():
+            return _subrequest_adder(self, self._req_method_list, func)
+        else:
+            raise AttributeError
+
+
+def _subrequest_adder(owner, req_method_list, func):
+    def function(**kwargs):
+
+        if not req_method_list:
+            owner.log.info('Create new request...')
+
+        name = func.upper()
+        if kwargs:
+            req_method_list.append( { RequestType.Value(name): kwargs } )
+            owner.log.info("Adding '%s' to RPC request including arguments", name)
+            owner.log.debug("Arguments of '%s': \n\r%s", name, kwargs)
+        else:
+            req_method_list.append( RequestType.Value(name) )
+            owner.log.info("Adding '%s' to RPC request", name)
+
+        return owner
+
+    return function
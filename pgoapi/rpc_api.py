@@ -26,24 +26,99 @@ Author: tjado <https://github.com/tejado>
 from __future__ import absolute_import
 
 import re
+import time
+import weakref
 import logging
 import requests
+import threading
 import subprocess
 
 from importlib import import_module
+from google.protobuf.message import DecodeError
+from timeit import default_timer
 
 from pgoapi.protobuf_to_dict import protobuf_to_dict
-from pgoapi.exceptions import NotLoggedInException, ServerBusyOrOfflineException
-from pgoapi.utilities import f2i, h2f, to_camel_case
+from pgoapi.exceptions import NotLoggedInException, ServerBusyOrOfflineException, CircuitOpenException, ServerTimeoutException
+from pgoapi.utilities import f2i, h2f, to_camel_case, request_type
+from pgoapi.metrics import LATENCY_BUCKETS, SIZE_BUCKETS, COUNT_BUCKETS
 
 from . import protos
 from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope
 from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
 from POGOProtos.Networking.Requests_pb2 import RequestType
 
+def add_hook(hooks, event, callback):
+    if event not in RpcApi.HOOKS:
+        raise ValueError('Unknown hook: {} (available: {})'.format(event, ', '.join(RpcApi.HOOKS)))
+    hooks.setdefault(event, []).append(callback)
+
+def remove_hook(hooks, event, callback):
+    if event not in RpcApi.HOOKS:
+        raise ValueError('Unknown hook: {} (available: {})'.format(event, ', '.join(RpcApi.HOOKS)))
+    callbacks = hooks.get(event, [])
+    if callback not in callbacks:
+        raise ValueError('Callback is not registered for {}'.format(event))
+    callbacks.remove(callback)
+    # without any callbacks left, RPCs skip the hook machinery again
+    if not callbacks:
+        del hooks[event]
+
+class _RpcMetrics:
+    """
+    The counters and histograms RpcApi records into one registry, looked up
+    once per registry instead of on every RPC.
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def of(cls, registry):
+        with cls._instances_lock:
+            rpc_metrics = cls._instances.get(registry)
+            if rpc_metrics is None:
+                rpc_metrics = cls._instances[registry] = cls(registry)
+            return rpc_metrics
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.lock = registry.lock
+
+        self.outcomes = {}
+        self.request_types = {}
+        self.status_codes = {}
+
+        self.build = registry.histogram('pgoapi_rpc_phase_seconds', (('phase', 'build'),))
+        self.network = registry.histogram('pgoapi_rpc_phase_seconds', (('phase', 'network'),))
+        self.parse = registry.histogram('pgoapi_rpc_phase_seconds', (('phase', 'parse'),))
+        self.request_bytes = registry.histogram('pgoapi_rpc_request_bytes')
+        self.response_bytes = registry.histogram('pgoapi_rpc_response_bytes')
+        self.subrequests = registry.histogram('pgoapi_rpc_subrequests')
+
+    def outcome(self, outcome):
+        counter = self.outcomes.get(outcome)
+        if counter is None:
+            counter = self.outcomes[outcome] = self.registry.counter('pgoapi_rpc_total', (('outcome', outcome),))
+        return counter
+
+    def request_type(self, entry_id):
+        counter = self.request_types.get(entry_id)
+        if counter is None:
+            labels = (('request_type', RequestType.Name(entry_id)),)
+            counter = self.request_types[entry_id] = self.registry.counter('pgoapi_rpc_subrequests_total', labels)
+        return counter
+
+    def status_code(self, status_code):
+        counter = self.status_codes.get(status_code)
+        if counter is None:
+            counter = self.status_codes[status_code] = self.registry.counter('pgoapi_rpc_status_total', (('status_code', status_code),))
+        return counter
+
 class RpcApi:
     
-    def __init__(self, auth_provider):
+    HOOKS = ('before_build', 'before_send', 'after_receive', 'after_parse')
+
+    def __init__(self, auth_provider, limiter = None, breakers = None, metrics = None, hooks = None, timeout = None):
     
         self.log = logging.getLogger(__name__)
     
@@ -52,7 +127,24 @@ class RpcApi:
         self._session.verify = True
         
         self._auth_provider = auth_provider
+        self._limiter = limiter
+        self._breakers = breakers
+        self._metrics = metrics
+        self._rpc_metrics = _RpcMetrics.of(metrics) if metrics is not None else None
+        self._hooks = hooks if hooks is not None else {}
+        self._timeout = timeout
+
+        self._api_endpoint = None
     
+    def get_api_endpoint(self):
+        return self._api_endpoint
+
+    def add_hook(self, event, callback):
+        add_hook(self._hooks, event, callback)
+
+    def remove_hook(self, event, callback):
+        remove_hook(self._hooks, event, callback)
+
     def get_rpc_id(self):
         return 8145806132888207460
 
@@ -71,34 +163,208 @@ class RpcApi:
         class_ = getattr(import_module(module_), class_)
         return class_
         
-    def _make_rpc(self, endpoint, request_proto_plain):
+    def get_request_classname(self, request_type):
+        proto_name = to_camel_case(RequestType.Name(request_type).lower()) + 'Message'
+        return 'POGOProtos.Networking.Requests.Messages_pb2.' + proto_name
+
+    def get_response_classname(self, request_type):
+        proto_name = to_camel_case(RequestType.Name(request_type).lower()) + 'Response'
+        return 'POGOProtos.Networking.Responses_pb2.' + proto_name
+        
+    def _make_rpc(self, endpoint, request_proto_plain, context = None):
         self.log.debug('Execution of RPC')
         
         request_proto_serialized = request_proto_plain.SerializeToString()
+
+        if context is not None:
+            context['endpoint'] = endpoint
+            context['request_bytes'] = request_proto_serialized
+            self._run_hooks('before_send', context)
+
         try:
-            http_response = self._session.post(endpoint, data=request_proto_serialized)
+            http_response = self._session.post(endpoint, data=request_proto_serialized, timeout=self._timeout)
+        except requests.exceptions.Timeout as e:
+            raise ServerTimeoutException
         except requests.exceptions.ConnectionError as e:
             raise ServerBusyOrOfflineException
+
+        if context is not None:
+            context['status_code'] = http_response.status_code
+            context['response_bytes'] = http_response.content
+            self._run_hooks('after_receive', context)
         
         return http_response
+
+    def _run_hooks(self, event, context):
+        for callback in self._hooks.get(event, ()):
+            callback(context)
     
     def request(self, endpoint, subrequests, player_position):
     
         if not self._auth_provider or self._auth_provider.is_login() is False:
             raise NotLoggedInException()
+
+        context = None
+        if self._hooks:
+            context = {'subrequests': subrequests, 'player_position': player_position}
+            self._run_hooks('before_build', context)
+            if context.get('response') is not None:
+                self.log.debug('RPC answered by a before_build hook')
+                return context['response']
     
+        started = default_timer()
         request_proto = self._build_main_request(subrequests, player_position)
-        response = self._make_rpc(endpoint, request_proto)
-        
-        response_dict = self._parse_main_response(response, subrequests)
+        build_seconds = default_timer() - started
 
-        if isinstance(response_dict, dict) and 'status_code' in response_dict:
-            sc = response_dict['status_code']
-            if sc == 102:
+        response_dict = None
+        # network seconds, parse seconds and response bytes over the RPC and a replay
+        stats = [None, None, None]
+        outcome = 'error'
+        try:
+            response, response_dict = self._exchange(endpoint, request_proto, subrequests, context, stats)
+
+            # the login call is answered with 53 and the api_url as well, PGoApi.login takes it from there
+            if isinstance(response_dict, dict) and response_dict.get('status_code') == 53 \
+                    and response_dict.get('api_url') and self._auth_provider.has_ticket():
+                response, response_dict = self._handle_new_endpoint(endpoint, request_proto, subrequests, response, response_dict, context, stats)
+
+            if isinstance(response_dict, dict) and response_dict.get('status_code') == 102:
+                outcome = 'not_logged_in'
                 raise NotLoggedInException()
 
+            if context is not None:
+                context['response'] = response_dict
+                self._run_hooks('after_parse', context)
+                response_dict = context['response']
+
+            if response.status_code != 200:
+                outcome = 'http_error'
+            elif not response_dict:
+                outcome = 'invalid_response'
+            else:
+                outcome = 'ok'
+        except CircuitOpenException:
+            outcome = 'circuit_open'
+            raise
+        except ServerTimeoutException:
+            outcome = 'timeout'
+            raise
+        except ServerBusyOrOfflineException:
+            outcome = 'busy'
+            raise
+        finally:
+            if self._metrics is not None:
+                self._record_metrics(subrequests, request_proto, response_dict, build_seconds, stats, outcome)
+
         return response_dict
     
+    @staticmethod
+    def describe_metrics(metrics):
+        metrics.describe('pgoapi_rpc_total', 'RPCs by outcome')
+        metrics.describe('pgoapi_rpc_status_total', 'RPC responses by envelope status code')
+        metrics.describe('pgoapi_rpc_subrequests_total', 'Subrequests by request type')
+        metrics.describe('pgoapi_rpc_phase_seconds', 'Duration of the build, network and parse phase of an RPC', LATENCY_BUCKETS)
+        metrics.describe('pgoapi_rpc_request_bytes', 'Size of the serialized request envelope', SIZE_BUCKETS)
+        metrics.describe('pgoapi_rpc_response_bytes', 'Size of the response envelope', SIZE_BUCKETS)
+        metrics.describe('pgoapi_rpc_subrequests', 'Subrequests per request envelope', COUNT_BUCKETS)
+
+    def _record_metrics(self, subrequests, request_proto, response_dict, build_seconds, stats, outcome):
+        rpc_metrics = self._rpc_metrics
+        counters = [rpc_metrics.outcome(outcome)]
+        for entry in subrequests:
+            counters.append(rpc_metrics.request_type(request_type(entry)))
+        if isinstance(response_dict, dict) and 'status_code' in response_dict:
+            counters.append(rpc_metrics.status_code(response_dict['status_code']))
+        request_size = request_proto.ByteSize()
+
+        network_seconds, parse_seconds, response_size = stats
+        with rpc_metrics.lock:
+            for counter in counters:
+                counter.value += 1
+            rpc_metrics.build.observe(build_seconds)
+            rpc_metrics.request_bytes.observe(request_size)
+            rpc_metrics.subrequests.observe(len(subrequests))
+            if network_seconds is not None:
+                rpc_metrics.network.observe(network_seconds)
+            if parse_seconds is not None:
+                rpc_metrics.parse.observe(parse_seconds)
+            if response_size is not None:
+                rpc_metrics.response_bytes.observe(response_size)
+
+    def _exchange(self, endpoint, request_proto, subrequests, context, stats):
+        """Sends request_proto and parses the response, the timings and size are added to stats."""
+        sent = default_timer()
+        response = self._send(endpoint, request_proto, context)
+        received = default_timer()
+        stats[0] = (stats[0] or 0) + received - sent
+        if response.content is not None:
+            stats[2] = (stats[2] or 0) + len(response.content)
+
+        response_dict = self._parse_main_response(response, subrequests)
+        stats[1] = (stats[1] or 0) + default_timer() - received
+        return response, response_dict
+
+    def _handle_new_endpoint(self, endpoint, request_proto, subrequests, response, response_dict, context, stats):
+        new_endpoint = 'https://{}/rpc'.format(response_dict['api_url'])
+        if new_endpoint == endpoint:
+            return response, response_dict
+
+        self.log.info('Server moved us to a new API endpoint: %s', new_endpoint)
+        self._api_endpoint = new_endpoint
+
+        # the server usually answers the subrequests anyway - replay only if it did not
+        if response_dict['responses'] or not subrequests:
+            return response, response_dict
+
+        self.log.info('Replaying request on the new API endpoint')
+        response, replayed = self._exchange(new_endpoint, request_proto, subrequests, context, stats)
+        if isinstance(replayed, dict):
+            for key in ('auth_ticket', 'api_url'):
+                if key in response_dict and key not in replayed:
+                    replayed[key] = response_dict[key]
+        return response, replayed
+
+    def _send(self, endpoint, request_proto, context = None):
+        if self._limiter is None and self._breakers is None:
+            return self._make_rpc(endpoint, request_proto, context)
+
+        breakers = self._allow_breakers(endpoint)
+
+        if self._limiter is not None:
+            started = self._limiter.acquire()
+        else:
+            started = time.time()
+
+        outcome = 'busy'
+        try:
+            response = self._make_rpc(endpoint, request_proto, context)
+            outcome = 'ok' if response.status_code == 200 else 'http_error'
+        except ServerTimeoutException:
+            outcome = 'timeout'
+            raise
+        finally:
+            if self._limiter is not None:
+                self._limiter.release(started, outcome, time.time() - started)
+            for breaker in breakers:
+                breaker.record(outcome == 'ok')
+
+        return response
+
+    def _allow_breakers(self, endpoint):
+        if self._breakers is None:
+            return []
+
+        allowed = []
+        for breaker in (self._breakers.for_endpoint(endpoint), self._breakers.for_account(self._auth_provider)):
+            if not breaker.allow():
+                for b in allowed:
+                    b.cancel()
+                self.log.info('Circuit open - RPC to %s not executed', endpoint)
+                raise CircuitOpenException()
+            allowed.append(breaker)
+
+        return allowed
+    
     def _build_main_request(self, subrequests, player_position = None):
         self.log.debug('Generating main RPC request...')
         
@@ -135,10 +401,8 @@ class RpcApi:
                 entry_id = list(entry.items())[0][0]
                 entry_content = entry[entry_id]
 
-                entry_name = RequestType.Name(entry_id)
-                
-                proto_name = to_camel_case(entry_name.lower()) + 'Message'
-                proto_classname = 'POGOProtos.Networking.Requests.Messages_pb2.' + proto_name
+                proto_classname = self.get_request_classname(entry_id)
+                proto_name = proto_classname.rsplit('.', 1)[1]
                 subrequest_extension = self.get_class(proto_classname)()
                 
                 self.log.debug("Subrequest class: %s", proto_classname)
@@ -182,7 +446,9 @@ class RpcApi:
         
         if response_raw.status_code != 200:
             self.log.warning('Unexpected HTTP server response - needs 200 got %s', response_raw.status_code)
-            self.log.debug('HTTP output: \n%s', response_raw.content.decode('utf-8'))
+            if self.log.isEnabledFor(logging.DEBUG) and response_raw.content is not None:
+                # content may also be a buffer of a CaptureFile
+                self.log.debug('HTTP output: \n%s', bytes(response_raw.content).decode('utf-8', 'replace'))
             return False
         
         if response_raw.content is None:
@@ -192,15 +458,16 @@ class RpcApi:
         response_proto = ResponseEnvelope()
         try:
             response_proto.ParseFromString(response_raw.content)
-        except google.protobuf.message.DecodeError as e:
+        except DecodeError as e:
             self.log.warning('Could not parse response: %s', str(e))
             return False
         
-        self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
-        try:
-            self.log.debug('Decode raw over protoc (protoc has to be in your PATH):\n\r%s', self.decode_raw(response_raw.content).decode('utf-8'))
-        except:
-            self.log.debug('Error during protoc parsing - ignored.')
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
+            try:
+                self.log.debug('Decode raw over protoc (protoc has to be in your PATH):\n\r%s', self.decode_raw(response_raw.content).decode('utf-8'))
+            except:
+                self.log.debug('Error during protoc parsing - ignored.')
        
         response_proto_dict = protobuf_to_dict(response_proto)
         response_proto_dict = self._parse_sub_responses(response_proto, subrequests, response_proto_dict)
@@ -227,8 +494,7 @@ class RpcApi:
                 entry_id =  list(request_entry.items())[0][0]
                 
             entry_name = RequestType.Name(entry_id)
-            proto_name = to_camel_case(entry_name.lower()) + 'Response'
-            proto_classname = 'POGOProtos.Networking.Responses_pb2.' + proto_name
+            proto_classname = self.get_response_classname(entry_id)
             
             self.log.debug("Parsing class: %s", proto_classname)
             
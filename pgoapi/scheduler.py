@@ -0,0 +1,226 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import math
+import time
+import heapq
+import logging
+import threading
+import itertools
+
+from pgoapi.cells import get_cell_ids
+from pgoapi.grid import DEFAULT_SCAN_RADIUS
+from pgoapi.mapsync import scan_cells
+from pgoapi.utilities import distance
+
+
+class ScanJob:
+
+    """A scan position and the time it has to be scanned at to see the pokemon of its spawn points."""
+
+    __slots__ = ('time', 'deadline', 'latitude', 'longitude', 'spawns')
+
+    def __init__(self, time, deadline, latitude, longitude, spawns):
+        self.time = time
+        self.deadline = deadline
+        self.latitude = latitude
+        self.longitude = longitude
+        self.spawns = spawns
+
+    def __repr__(self):
+        return '<ScanJob {:.6f},{:.6f} at {:.0f} spawns={}>'.format(self.latitude, self.longitude, self.time, len(self.spawns))
+
+
+class SpawnScheduler:
+
+    """
+    Scans spawn points just after their pokemon appear instead of sweeping the area.
+
+    The spawns (with learned schedules, see SpawnDatabase) are grouped into
+    scan jobs: a job is placed on a spawn point and takes all spawns within
+    scan_radius whose pokemon are visible at the same time. Jobs wait in a
+    priority queue by time-to-spawn and are handed to the next idle account
+    when they are due; a job which could not be started before its pokemon
+    despawn counts as missed. Every job repeats an hour later.
+
+        scheduler = SpawnScheduler(spawn_db.spawns(scheduled_only=True))
+        scheduler.start([api1, api2], callback=lambda job, response: store.ingest(response))
+    """
+
+    def __init__(self, spawns, scan_radius=DEFAULT_SCAN_RADIUS, delay=10, margin=30, clock=time.time):
+        self.log = logging.getLogger(__name__)
+
+        self._scan_radius = scan_radius
+        self._delay = delay
+        self._margin = margin
+        self._clock = clock
+
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._workers = []
+
+        self.scans = 0
+        self.missed = 0
+
+        self._plan([spawn for spawn in spawns if spawn.despawn_second is not None], clock())
+
+    def __len__(self):
+        return len(self._queue)
+
+    def jobs(self):
+        return sorted((job for _, _, job in self._queue), key=lambda job: job.time)
+
+    def next_time(self):
+        with self._condition:
+            return self._queue[0][0] if self._queue else None
+
+    def due(self, now=None):
+        """Pops the jobs due at now and schedules them for the next hour; jobs past their deadline count as missed."""
+        if now is None:
+            now = self._clock()
+
+        jobs = []
+        with self._condition:
+            while self._queue and self._queue[0][0] <= now:
+                job = self._pop()
+                if now > job.deadline:
+                    self.missed += 1
+                    continue
+                jobs.append(job)
+        return jobs
+
+    def scan(self, api, job):
+        cell_ids = get_cell_ids(job.latitude, job.longitude, self._scan_radius)
+        with self._condition:
+            self.scans += 1
+        return scan_cells(api, job.latitude, job.longitude, cell_ids)
+
+    def start(self, apis, callback=None):
+        """Starts one worker thread per account, each takes the next due job as soon as it is idle."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            for api in apis:
+                worker = threading.Thread(target=self._run, args=(api, callback))
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _run(self, api, callback):
+        while True:
+            job = None
+            with self._condition:
+                while self._running and job is None:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    wait = self._queue[0][0] - self._clock()
+                    if wait > 0:
+                        self._condition.wait(wait)
+                        continue
+                    job = self._pop()
+                    if self._clock() > job.deadline:
+                        self.missed += 1
+                        job = None
+                if not self._running:
+                    return
+
+            try:
+                response = self.scan(api, job)
+            except Exception as e:
+                self.log.warning('Scan at %s,%s failed: %s', job.latitude, job.longitude, e)
+                continue
+            if callback is not None:
+                callback(job, response)
+
+    def _pop(self):
+        # called with the condition held
+        _, _, job = heapq.heappop(self._queue)
+        self._push(ScanJob(job.time + 3600, job.deadline + 3600, job.latitude, job.longitude, job.spawns))
+        return job
+
+    def _push(self, job):
+        heapq.heappush(self._queue, (job.time, next(self._counter), job))
+        self._condition.notify()
+
+    def _plan(self, spawns, now):
+        # spawns in order of appearance, each joins an open job nearby which can still be moved to its
+        # appearance or opens a new job on its own position
+        windows = []
+        for spawn in spawns:
+            start, end = spawn.next_appearance(now)
+            if end - self._margin < now:
+                # too late for the current appearance
+                start, end = start + 3600, end + 3600
+            # a job of a pokemon which is already visible has its time in the past, so it is due right away
+            windows.append((start + self._delay, end - self._margin, spawn))
+        windows.sort(key=lambda w: w[0])
+
+        size_lat = self._scan_radius / 111320.0
+        buckets = {}
+        jobs = []
+        for target, deadline, spawn in windows:
+            if target > deadline:
+                continue
+            size_lng = size_lat / max(0.01, math.cos(math.radians(spawn.latitude)))
+            key = (int(math.floor(spawn.latitude / size_lat)), int(math.floor(spawn.longitude / size_lng)))
+
+            job = self._find_job(buckets, key, spawn, target, deadline)
+            if job is None:
+                job = ScanJob(target, deadline, spawn.latitude, spawn.longitude, [spawn])
+                buckets.setdefault(key, []).append(job)
+                jobs.append(job)
+            else:
+                job.time = max(job.time, target)
+                job.deadline = min(job.deadline, deadline)
+                job.spawns.append(spawn)
+
+        with self._condition:
+            for job in jobs:
+                self._push(job)
+        self.log.info('Scheduled %s spawn points in %s scan jobs', len(windows), len(jobs))
+
+    def _find_job(self, buckets, key, spawn, target, deadline):
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                for job in buckets.get((key[0] + i, key[1] + j), ()):
+                    if max(job.time, target) > min(job.deadline, deadline):
+                        continue
+                    if distance(job.latitude, job.longitude, spawn.latitude, spawn.longitude) <= self._scan_radius:
+                        return job
+        return None
@@ -0,0 +1,278 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import sqlite3
+import logging
+import threading
+
+from pgoapi.cells import spawnpoint_id
+from pgoapi.mapsync import map_cells, despawn_time_ms
+
+# spawn points are active for 15, 30 or 60 minutes every hour
+SPAWN_DURATIONS = (900, 1800, 3600)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spawn_points (
+    id TEXT PRIMARY KEY,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    cell_id INTEGER,
+    decimated INTEGER NOT NULL DEFAULT 0,
+    first_seen_ms INTEGER NOT NULL,
+    last_seen_ms INTEGER NOT NULL,
+    sightings INTEGER NOT NULL DEFAULT 0,
+    despawn_second INTEGER,
+    max_time_till_hidden INTEGER
+);
+CREATE INDEX IF NOT EXISTS spawn_points_location ON spawn_points (latitude, longitude);
+"""
+
+
+class Spawn:
+
+    """A spawn point with its learned schedule (spawn_second and duration are None until a pokemon was seen)."""
+
+    __slots__ = ('id', 'latitude', 'longitude', 'cell_id', 'decimated', 'first_seen_ms', 'last_seen_ms',
+                 'sightings', 'despawn_second', 'max_time_till_hidden')
+
+    @property
+    def duration(self):
+        if self.despawn_second is None:
+            return None
+        # the shortest duration consistent with the earliest sighting before the despawn
+        for duration in SPAWN_DURATIONS:
+            if self.max_time_till_hidden <= duration:
+                return duration
+        return SPAWN_DURATIONS[-1]
+
+    @property
+    def spawn_second(self):
+        """Second of the hour the pokemon appears."""
+        if self.despawn_second is None:
+            return None
+        return (self.despawn_second - self.duration) % 3600
+
+    def next_appearance(self, now):
+        """(start, end) of the current or next appearance after now, in seconds since the epoch."""
+        if self.despawn_second is None:
+            return None
+        end = now - (now - self.despawn_second) % 3600
+        if end <= now:
+            end += 3600
+        start = end - self.duration
+        return start, end
+
+    def is_active(self, now):
+        window = self.next_appearance(now)
+        return window is not None and window[0] <= now < window[1]
+
+    def __repr__(self):
+        return '<Spawn {} {:.6f},{:.6f} spawn_second={} duration={}>'.format(
+            self.id, self.latitude, self.longitude, self.spawn_second, self.duration)
+
+
+class SpawnDatabase:
+
+    """
+    SQLite database of spawn points and their hourly schedules.
+
+    Fed from the spawn_points, decimated_spawn_points and wild_pokemons of
+    GET_MAP_OBJECTS map cells. The despawn second of the hour comes from
+    current_timestamp_ms + time_till_hidden_ms; the longest time_till_hidden_ms
+    seen so far bounds the duration (15, 30 or 60 minutes), which gives the
+    second of the hour the pokemon appears.
+
+    Observations are aggregated per spawn point in memory and written in one
+    transaction per batch_size spawn points or flush_interval seconds:
+
+        with SpawnDatabase('spawns.db') as spawns:
+            spawns.ingest(response)
+            spawns.query_bbox(lat1, lng1, lat2, lng2)
+    """
+
+    def __init__(self, path=':memory:', batch_size=5000, flush_interval=1.0, clock=time.time):
+        self.log = logging.getLogger(__name__)
+
+        self._path = path
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+
+        self._pending = {}
+        self._last_flush = clock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self.flush()
+                self._conn.close()
+                self._conn = None
+
+    def ingest(self, response):
+        """Adds the map cells of a response (see mapsync.map_cells), returns their number."""
+        cells = map_cells(response)
+        for map_cell in cells:
+            self.add_cell(map_cell)
+        return len(cells)
+
+    def add_cell(self, map_cell):
+        cell_id = map_cell.get('s2_cell_id')
+        now_ms = map_cell.get('current_timestamp_ms') or int(self._clock() * 1000)
+
+        with self._lock:
+            for point in map_cell.get('spawn_points', []):
+                self._observe(spawnpoint_id(point['latitude'], point['longitude']),
+                              point['latitude'], point['longitude'], cell_id, now_ms)
+            for point in map_cell.get('decimated_spawn_points', []):
+                self._observe(spawnpoint_id(point['latitude'], point['longitude']),
+                              point['latitude'], point['longitude'], cell_id, now_ms, decimated=True)
+            for pokemon in map_cell.get('wild_pokemons', []):
+                self._observe(pokemon['spawnpoint_id'], pokemon['latitude'], pokemon['longitude'], cell_id, now_ms,
+                              time_till_hidden_ms=pokemon.get('time_till_hidden_ms', 0))
+            self._maybe_flush()
+
+    def add_sighting(self, spawn_id, latitude, longitude, seen_ms, time_till_hidden_ms=0, cell_id=None):
+        with self._lock:
+            self._observe(spawn_id, latitude, longitude, cell_id, seen_ms, time_till_hidden_ms=time_till_hidden_ms)
+            self._maybe_flush()
+
+    def flush(self):
+        """Writes the pending observations in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = self._clock()
+            if not pending:
+                return 0
+
+            rows = list(pending.values())
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO spawn_points (id, latitude, longitude, cell_id, decimated, first_seen_ms, last_seen_ms) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(r[0], r[1], r[2], _signed(r[3]), r[4], r[5], r[6]) for r in rows])
+                # merge with what is stored: the latest despawn second wins, the longest lead time bounds the duration
+                self._conn.executemany(
+                    'UPDATE spawn_points SET '
+                    'cell_id = COALESCE(cell_id, ?), '
+                    'decimated = MIN(decimated, ?), '
+                    'first_seen_ms = MIN(first_seen_ms, ?), '
+                    'last_seen_ms = MAX(last_seen_ms, ?), '
+                    'sightings = sightings + ?, '
+                    'despawn_second = COALESCE(?, despawn_second), '
+                    'max_time_till_hidden = MAX(COALESCE(max_time_till_hidden, 0), COALESCE(?, 0)) '
+                    'WHERE id = ?',
+                    [(_signed(r[3]), r[4], r[5], r[6], r[7], r[8], r[9], r[0]) for r in rows])
+
+            self.log.debug('Wrote %s spawn points', len(rows))
+            return len(rows)
+
+    def get(self, spawn_id):
+        self.flush()
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM spawn_points WHERE id = ?', (spawn_id,)).fetchone()
+        return _to_spawn(row) if row else None
+
+    def count(self):
+        self.flush()
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM spawn_points').fetchone()[0]
+
+    def spawns(self, scheduled_only=False):
+        """All spawn points, or only those with a learned schedule."""
+        self.flush()
+        query = 'SELECT * FROM spawn_points'
+        if scheduled_only:
+            query += ' WHERE despawn_second IS NOT NULL'
+        with self._lock:
+            rows = self._conn.execute(query).fetchall()
+        return [_to_spawn(row) for row in rows]
+
+    def query_bbox(self, lat1, lng1, lat2, lng2):
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM spawn_points WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?',
+                (min(lat1, lat2), max(lat1, lat2), min(lng1, lng2), max(lng1, lng2))).fetchall()
+        return [_to_spawn(row) for row in rows]
+
+    def _observe(self, spawn_id, latitude, longitude, cell_id, seen_ms, decimated=False, time_till_hidden_ms=0):
+        despawn_second = None
+        time_till_hidden = None
+        despawn_ms = despawn_time_ms(seen_ms, time_till_hidden_ms)
+        if despawn_ms is not None:
+            despawn_second = int(round(despawn_ms / 1000.0)) % 3600
+            time_till_hidden = int(round(time_till_hidden_ms / 1000.0))
+
+        row = self._pending.get(spawn_id)
+        if row is None:
+            self._pending[spawn_id] = [spawn_id, latitude, longitude, cell_id, int(decimated), seen_ms, seen_ms,
+                                       1 if despawn_second is not None else 0, despawn_second, time_till_hidden]
+            return
+
+        if row[3] is None:
+            row[3] = cell_id
+        row[4] = min(row[4], int(decimated))
+        row[5] = min(row[5], seen_ms)
+        row[6] = max(row[6], seen_ms)
+        if despawn_second is not None:
+            row[7] += 1
+            row[8] = despawn_second
+            row[9] = max(row[9] or 0, time_till_hidden)
+
+    def _maybe_flush(self):
+        if len(self._pending) >= self._batch_size or self._clock() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+
+def _to_spawn(row):
+    spawn = Spawn()
+    (spawn.id, spawn.latitude, spawn.longitude, spawn.cell_id, spawn.decimated, spawn.first_seen_ms,
+     spawn.last_seen_ms, spawn.sightings, spawn.despawn_second, spawn.max_time_till_hidden) = row
+    spawn.decimated = bool(spawn.decimated)
+    if spawn.cell_id is not None and spawn.cell_id < 0:
+        spawn.cell_id += 1 << 64
+    return spawn
+
+def _signed(cell_id):
+    # SQLite integers are signed 64 bit, cell ids of the faces 4 and 5 do not fit otherwise
+    if cell_id is not None and cell_id >= 1 << 63:
+        return cell_id - (1 << 64)
+    return cell_id
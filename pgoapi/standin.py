@@ -0,0 +1,130 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from six.moves import BaseHTTPServer, socketserver
+
+from pgoapi.auth import Auth
+
+
+class StandInServer:
+    """
+    Local HTTP server which answers pgoapi RPCs instead of the real servers,
+    for replays, offline benchmarks and load tests.
+
+    The handler gets the raw RequestEnvelope bytes of every POST and returns
+    a tuple (http status code, raw ResponseEnvelope bytes):
+
+        server = StandInServer(handler)
+        server.start()
+        api.set_api_endpoint(server.url)
+        api.login(StandInAuth(), 'user', 'password')
+        ...
+        server.stop()
+    """
+
+    def __init__(self, handler, host='127.0.0.1', port=0):
+
+        self.log = logging.getLogger(__name__)
+
+        self._handler = handler
+        self._server = _ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.rpc_handler = handler
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}/rpc'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        self.log.info('Stand-in server listening on %s', self.url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request_bytes = self.rfile.read(length)
+
+        try:
+            status_code, response_bytes = self.server.rpc_handler(request_bytes)
+        except Exception as e:
+            logging.getLogger(__name__).exception('Stand-in handler failed')
+            status_code, response_bytes = 500, str(e).encode('utf-8')
+
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/x-protobuf')
+        self.send_header('Content-Length', str(len(response_bytes)))
+        self.end_headers()
+        self.wfile.write(response_bytes)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format, *args)
+
+
+class StandInAuth(Auth):
+    """
+    Auth provider which accepts every login without contacting PTC or
+    Google, for clients of a StandInServer.
+    """
+
+    def __init__(self):
+        Auth.__init__(self)
+
+        self._auth_provider = 'ptc'
+
+    def login(self, username, password):
+        self._auth_token = 'stand-in-{}'.format(username)
+        self._login = True
+        return True
@@ -0,0 +1,172 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import heapq
+import itertools
+import logging
+
+from pgoapi.mapsync import MAX_TIME_TILL_HIDDEN_MS, map_cells, despawn_time_ms
+
+
+class TTLIndex:
+
+    """
+    Values by key which expire at a given time.
+
+    Expiry times live in a min-heap. Updating a key pushes a new heap entry
+    and leaves the old one behind, which is skipped when it comes up and
+    compacted away once stale entries outnumber live ones, so inserts and
+    updates are amortized O(log n) and expire() costs O(log n) per evicted key.
+    Times are plain numbers, seconds of clock() unless given explicitly.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._entries = {}
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def set(self, key, value, expires_at):
+        seq = next(self._counter)
+        self._entries[key] = (expires_at, seq, value)
+        heapq.heappush(self._heap, (expires_at, seq, key))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        return default if entry is None else entry[2]
+
+    def expires_at(self, key):
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[2]
+
+    def next_expiry(self):
+        """Earliest expiry time of all keys, None if empty."""
+        heap = self._heap
+        while heap and self._is_stale(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def expire(self, now=None):
+        """Removes all keys which expired at or before now and returns them as list of (key, value)."""
+        if now is None:
+            now = self._clock()
+
+        expired = []
+        heap = self._heap
+        entries = self._entries
+        while heap and heap[0][0] <= now:
+            expires_at, seq, key = heapq.heappop(heap)
+            entry = entries.get(key)
+            if entry is not None and entry[1] == seq:
+                del entries[key]
+                expired.append((key, entry[2]))
+        return expired
+
+    def visible(self, now=None):
+        """Iterates over (key, value) of all keys which have not expired yet, without removing the others."""
+        if now is None:
+            now = self._clock()
+        for key, (expires_at, seq, value) in list(self._entries.items()):
+            if expires_at > now:
+                yield key, value
+
+    def _is_stale(self, item):
+        entry = self._entries.get(item[2])
+        return entry is None or entry[1] != item[1]
+
+    def _compact(self):
+        self._heap = [(expires_at, seq, key) for key, (expires_at, seq, value) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+
+class SightingIndex(TTLIndex):
+
+    """
+    Pokemon sightings of GET_MAP_OBJECTS responses until they despawn.
+
+    Keyed by encounter_id (default) or spawnpoint_id; the despawn time is taken
+    from expiration_timestamp_ms of catchable pokemon or the time_till_hidden_ms
+    of wild pokemon, pokemon without a usable despawn time are kept for
+    default_ttl seconds. Each stored value is the pokemon dict of the response
+    with an additional 'hides_at' (seconds):
+
+        sightings = SightingIndex()
+        sightings.ingest(api.call())
+        for encounter_id, pokemon in sightings.visible():
+            ...
+        sightings.expire()
+    """
+
+    def __init__(self, key='encounter_id', default_ttl=900, clock=time.time):
+        TTLIndex.__init__(self, clock)
+        self.log = logging.getLogger(__name__)
+
+        self._key = key
+        self._default_ttl = default_ttl
+
+    def ingest(self, response):
+        """Adds the wild and catchable pokemon of a response (see mapsync.map_cells), returns the number of sightings."""
+        count = 0
+        now = self._clock()
+        for map_cell in map_cells(response):
+            now_ms = map_cell.get('current_timestamp_ms') or now * 1000
+            for pokemon in map_cell.get('wild_pokemons', []):
+                hides_at_ms = despawn_time_ms(now_ms, pokemon.get('time_till_hidden_ms', 0))
+                count += self._add(pokemon, hides_at_ms / 1000.0 if hides_at_ms else None, now)
+            for pokemon in map_cell.get('catchable_pokemons', []):
+                expiration_ms = pokemon.get('expiration_timestamp_ms')
+                count += self._add(pokemon, expiration_ms / 1000.0 if expiration_ms else None, now)
+        return count
+
+    def _add(self, pokemon, hides_at, now):
+        key = pokemon.get(self._key)
+        if key is None:
+            return 0
+        if hides_at is None:
+            # keep a known despawn time of an earlier sighting
+            hides_at = self.expires_at(key) or now + self._default_ttl
+        # wild and catchable sightings of the same encounter are merged into one dict
+        previous = self.get(key)
+        if previous is not None and previous.get('encounter_id') == pokemon.get('encounter_id'):
+            previous.update(pokemon)
+            pokemon = previous
+        pokemon['hides_at'] = hides_at
+        self.set(key, pokemon, hides_at)
+        return 1
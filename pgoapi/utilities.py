@@ -23,9 +23,12 @@ OR OTHER DEALINGS IN THE SOFTWARE.
 Author: tjado <https://github.com/tejado>
 """
 
+import math
 import struct
 import re
 
+EARTH_RADIUS = 6371008.8
+
 def f2i(float):
   return struct.unpack('<Q', struct.pack('<d', float))[0]
 
@@ -34,9 +37,47 @@ def f2h(float):
 
 def h2f(hex):
   return struct.unpack('<d', struct.pack('<Q', int(hex,16)))[0]
+
+def i2f(int):
+  return struct.unpack('<d', struct.pack('<Q', int))[0]
+
+def distance(lat1, lng1, lat2, lng2):
+  # haversine distance in metres
+  lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+  a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+  return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+def point_in_polygon(point, polygon):
+  # even-odd ray casting, planar
+  y, x = point
+  inside = False
+  j = len(polygon) - 1
+  for i in range(len(polygon)):
+    yi, xi = polygon[i]
+    yj, xj = polygon[j]
+    if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+      inside = not inside
+    j = i
+  return inside
+
+def _ccw(a, b, c):
+  return (c[0] - a[0]) * (b[1] - a[1]) - (b[0] - a[0]) * (c[1] - a[1])
+
+def segments_intersect(a, b, c, d):
+  d1 = _ccw(c, d, a)
+  d2 = _ccw(c, d, b)
+  d3 = _ccw(a, b, c)
+  d4 = _ccw(a, b, d)
+  return ((d1 > 0) != (d2 > 0)) and ((d3 > 0) != (d4 > 0))
   
 def to_camel_case(value):
   return ''.join(word.capitalize() if word else '_' for word in value.split('_'))
 
 
             
+
+def request_type(entry):
+  # subrequest entries are a request type or {request type: arguments}
+  if isinstance(entry, dict):
+    return next(iter(entry))
+  return entry
@@ -0,0 +1,259 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import select
+import logging
+import threading
+import multiprocessing
+
+try:
+    from multiprocessing.connection import wait as _connection_wait
+except ImportError:
+    _connection_wait = None
+
+from pgoapi.pgoapi import PGoApi
+from pgoapi.cells import get_cell_ids
+from pgoapi.grid import DEFAULT_SCAN_RADIUS
+from pgoapi.mapsync import scan_cells
+
+
+class ScanRunner:
+
+    """
+    Scans positions with many accounts in several worker processes.
+
+    Every worker process owns a work queue and logs in its share of the
+    accounts, with one thread per account. The queues start as one contiguous
+    run of the positions each (so a worker starts with nearby positions) and
+    live in shared memory as a range of position indices with a lock per
+    worker. A worker takes chunks from the front of its own queue; once it is
+    empty, the worker steals the back half of the longest queue of another
+    worker directly, without a round trip to the calling process. Responses
+    stream back over one pipe per worker and are passed to the callback in
+    the calling process:
+
+        runner = ScanRunner(accounts=[('ptc', 'user1', 'pw1'), ('ptc', 'user2', 'pw2')], processes=2)
+        runner.run(plan.points, callback=lambda position, response: store.ingest(response))
+
+    Accounts are (provider, username, password) tuples; the provider may also
+    be a picklable Auth instance. scan(api, lat, lng) replaces the default
+    GET_MAP_OBJECTS request of the cells within scan_radius, it has to be a
+    module level function so it can be handed to the worker processes.
+    """
+
+    def __init__(self, accounts, processes=None, chunk_size=4, scan_radius=DEFAULT_SCAN_RADIUS, api_endpoint=None, scan=None):
+        self.log = logging.getLogger(__name__)
+
+        if not accounts:
+            raise ValueError('At least one account is needed')
+
+        processes = processes or multiprocessing.cpu_count()
+        self._processes = max(1, min(processes, len(accounts)))
+        self._accounts = list(accounts)
+        self._chunk_size = chunk_size
+        self._scan_radius = scan_radius
+        self._api_endpoint = api_endpoint
+        self._scan = scan
+
+        self.stats = {}
+
+    def run(self, positions, callback=None):
+        """Scans all (lat, lng) positions, returns the number of successful scans."""
+        positions = list(positions)
+        workers = self._processes
+
+        # queue i holds the position indices [ranges[2 * i], ranges[2 * i + 1])
+        ranges = multiprocessing.Array('l', 2 * workers, lock=False)
+        locks = [multiprocessing.Lock() for _ in range(workers)]
+        for i in range(workers):
+            ranges[2 * i] = len(positions) * i // workers
+            ranges[2 * i + 1] = len(positions) * (i + 1) // workers
+
+        connections = []
+        processes = []
+        for i in range(workers):
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            queues = _WorkQueues(i, ranges, locks, self._chunk_size)
+            process = multiprocessing.Process(target=_worker, name='ScanRunner-worker-{}'.format(i),
+                                              args=(i, writer, queues, positions, self._accounts[i::workers],
+                                                    self._scan, self._scan_radius, self._api_endpoint))
+            process.daemon = True
+            process.start()
+            writer.close()
+            connections.append(reader)
+            processes.append(process)
+
+        self.stats = {'scanned': 0, 'errors': 0, 'steals': 0, 'per_worker': [0] * workers}
+        started = time.time()
+        open_connections = dict((conn, i) for i, conn in enumerate(connections))
+        try:
+            while open_connections:
+                for conn in _wait(list(open_connections)):
+                    worker = open_connections[conn]
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        del open_connections[conn]
+                        continue
+                    self._handle(worker, message, callback)
+                    if message[0] == 'done':
+                        del open_connections[conn]
+        finally:
+            for conn in connections:
+                conn.close()
+            for process in processes:
+                process.join(5)
+
+        self.stats['duration'] = time.time() - started
+        self.log.info('Scanned %s positions in %.1fs (%s errors, %s steals)', self.stats['scanned'],
+                      self.stats['duration'], self.stats['errors'], self.stats['steals'])
+        return self.stats['scanned']
+
+    def _handle(self, worker, message, callback):
+        kind = message[0]
+        if kind == 'result':
+            self.stats['scanned'] += 1
+            self.stats['per_worker'][worker] += 1
+            if callback is not None:
+                callback(message[1], message[2])
+        elif kind == 'error':
+            self.stats['errors'] += 1
+            self.log.warning('Scan at %s failed in worker %s: %s', message[1], worker, message[2])
+        elif kind == 'done':
+            self.stats['steals'] += message[1]
+
+
+class _WorkQueues:
+
+    """The shared work queues of all workers, as seen from worker `own`."""
+
+    def __init__(self, own, ranges, locks, chunk_size):
+        self._own = own
+        self._ranges = ranges
+        self._locks = locks
+        self._chunk_size = chunk_size
+        self.steals = 0
+
+    def take(self):
+        """Position indices of the next chunk, from the own queue or stolen; empty once all queues are empty."""
+        while True:
+            chunk = self._pop_front()
+            if chunk:
+                return chunk
+            if not self._steal():
+                return []
+
+    def _pop_front(self):
+        ranges, own = self._ranges, self._own
+        with self._locks[own]:
+            start = ranges[2 * own]
+            end = min(start + self._chunk_size, ranges[2 * own + 1])
+            ranges[2 * own] = end
+        return list(range(start, end))
+
+    def _steal(self):
+        ranges, own = self._ranges, self._own
+        while True:
+            # pick the longest queue without locking, then check it again under its lock
+            victims = [(ranges[2 * i + 1] - ranges[2 * i], i) for i in range(len(self._locks)) if i != own]
+            if not victims:
+                return False
+            size, victim = max(victims)
+            if size <= 0:
+                return False
+
+            with self._locks[victim]:
+                start, end = ranges[2 * victim], ranges[2 * victim + 1]
+                if end <= start:
+                    continue
+                middle = start + (end - start) // 2
+                ranges[2 * victim + 1] = middle
+            with self._locks[own]:
+                ranges[2 * own], ranges[2 * own + 1] = middle, end
+            self.steals += 1
+            return True
+
+
+def _wait(connections):
+    if _connection_wait is not None:
+        return _connection_wait(connections)
+    return select.select(connections, [], [])[0]
+
+def _worker(worker, conn, queues, positions, accounts, scan, scan_radius, api_endpoint):
+    log = logging.getLogger(__name__)
+    lock = threading.Lock()
+    local = []
+
+    def next_position():
+        # the account threads of this worker share the chunk taken from the queues
+        with lock:
+            if not local:
+                local.extend(reversed(queues.take()))
+            return positions[local.pop()] if local else None
+
+    def send(message):
+        with lock:
+            conn.send(message)
+
+    def run_account(provider, username, password):
+        api = PGoApi()
+        if api_endpoint:
+            api.set_api_endpoint(api_endpoint)
+        try:
+            if not api.login(provider, username, password):
+                log.error('Login of %s failed in worker %s', username, worker)
+                return
+        except Exception as e:
+            log.error('Login of %s failed in worker %s: %s', username, worker, e)
+            return
+
+        while True:
+            position = next_position()
+            if position is None:
+                return
+            try:
+                if scan is not None:
+                    response = scan(api, position[0], position[1])
+                else:
+                    response = scan_cells(api, position[0], position[1], get_cell_ids(position[0], position[1], scan_radius))
+            except Exception as e:
+                send(('error', position, str(e)))
+                continue
+            if response:
+                send(('result', position, response))
+            else:
+                send(('error', position, 'empty response'))
+
+    threads = [threading.Thread(target=run_account, args=account) for account in accounts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    send(('done', queues.steals))
+    conn.close()
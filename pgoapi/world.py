@@ -0,0 +1,273 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import math
+import time
+import random
+import logging
+
+from s2sphere import Cell, CellId, LatLng
+
+from pgoapi.cells import spawnpoint_id
+from pgoapi.rpc_api import RpcApi
+from pgoapi.utilities import i2f, distance
+
+from . import protos
+from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope, ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Responses_pb2 import GetMapObjectsResponse
+
+# species which make up most of the spawns, the rest is spread over all 151
+COMMON_POKEMON = (10, 13, 16, 19, 21, 41, 46, 48, 54, 60, 69, 96, 98, 118, 120, 129, 133)
+
+class _Fort:
+    __slots__ = ('id', 'latitude', 'longitude', 'type', 'last_modified_ms')
+
+class _Spawn:
+    __slots__ = ('id', 'latitude', 'longitude', 'second', 'duration')
+
+
+class SyntheticWorld:
+    """
+    Deterministic synthetic world for offline scans and load tests.
+
+    The content of every S2 cell is derived from the seed and the cell id
+    only, so any list of cells gives the same forts and spawn points no
+    matter in which order or from which position they are requested. Spawn
+    points spawn a pokemon every hour at a fixed second for `spawn_duration`
+    seconds (some for 30 or 60 minutes). Wild and catchable pokemon are
+    returned within `visible_radius` metres of the player, nearby pokemon
+    within `nearby_radius` metres. With since_timestamp_ms only objects
+    modified since then and the encounter ids of pokemon which despawned in
+    between (deleted_objects) are returned.
+
+    A world can answer the RPCs of a StandInServer:
+
+        world = SyntheticWorld(seed=42)
+        server = StandInServer(world.handle).start()
+    """
+
+    def __init__(self, seed=0, forts_per_cell=2.0, spawns_per_cell=12.0, gym_ratio=0.15, spawn_duration=900,
+                 visible_radius=70, nearby_radius=200, level=15, clock=time.time, cache_size=100000):
+
+        self.log = logging.getLogger(__name__)
+
+        self._seed = seed
+        self._forts_per_cell = forts_per_cell
+        self._spawns_per_cell = spawns_per_cell
+        self._gym_ratio = gym_ratio
+        self._spawn_duration = spawn_duration
+        self._visible_radius = visible_radius
+        self._nearby_radius = nearby_radius
+        self._level = level
+        self._clock = clock
+
+        self._cache_size = cache_size
+        self._cells = {}
+
+        self._rpc = RpcApi(None)
+        self.handlers = {
+            RequestType.Value('GET_MAP_OBJECTS'): self._handle_get_map_objects,
+        }
+
+    def cell(self, cell_id):
+        """Returns the (forts, spawn points) of a cell."""
+        content = self._cells.get(cell_id)
+        if content is None:
+            if len(self._cells) >= self._cache_size:
+                self._cells.clear()
+            content = self._cells[cell_id] = self._generate_cell(cell_id)
+        return content
+
+    def map_objects(self, cell_ids, latitude, longitude, since_timestamp_ms=None, now=None):
+        if now is None:
+            now = self._clock()
+        now_ms = int(now * 1000)
+
+        response = GetMapObjectsResponse()
+        response.status = 1
+
+        for i, cell_id in enumerate(cell_ids):
+            since_ms = since_timestamp_ms[i] if since_timestamp_ms and i < len(since_timestamp_ms) else 0
+            forts, spawns = self.cell(cell_id)
+
+            map_cell = response.map_cells.add()
+            map_cell.s2_cell_id = cell_id
+            map_cell.current_timestamp_ms = now_ms
+
+            for fort in forts:
+                if fort.last_modified_ms > since_ms:
+                    fort_data = map_cell.forts.add()
+                    fort_data.id = fort.id
+                    fort_data.last_modified_timestamp_ms = fort.last_modified_ms
+                    fort_data.latitude = fort.latitude
+                    fort_data.longitude = fort.longitude
+                    fort_data.enabled = True
+                    fort_data.type = fort.type
+
+            for spawn in spawns:
+                if since_ms == 0:
+                    spawn_point = map_cell.spawn_points.add()
+                    spawn_point.latitude = spawn.latitude
+                    spawn_point.longitude = spawn.longitude
+
+                self._add_pokemon(map_cell, spawn, latitude, longitude, now, since_ms)
+
+        return response
+
+    def handle(self, request_bytes):
+        """StandInServer handler."""
+        request = RequestEnvelope()
+        request.ParseFromString(request_bytes)
+
+        response = ResponseEnvelope()
+        response.status_code = 1
+        response.request_id = request.request_id
+
+        for subrequest in request.requests:
+            handler = self.handlers.get(subrequest.request_type)
+            if handler is not None:
+                subresponse = handler(request, subrequest)
+            else:
+                subresponse = self._rpc.get_class(self._rpc.get_response_classname(subrequest.request_type))()
+            response.returns.append(subresponse.SerializeToString())
+
+        return 200, response.SerializeToString()
+
+    def _handle_get_map_objects(self, request, subrequest):
+        message = self._rpc.get_class(self._rpc.get_request_classname(subrequest.request_type))()
+        message.ParseFromString(subrequest.request_message)
+
+        latitude, longitude = message.latitude, message.longitude
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            # f2i encoded coordinates (see pokecli) - use the position of the envelope
+            latitude, longitude = i2f(request.latitude), i2f(request.longitude)
+
+        return self.map_objects(list(message.cell_id), latitude, longitude, list(message.since_timestamp_ms))
+
+    def _add_pokemon(self, map_cell, spawn, latitude, longitude, now, since_ms):
+        # start of the latest appearance of this spawn point
+        start = math.floor((now - spawn.second) / 3600.0) * 3600 + spawn.second
+        end = start + spawn.duration
+
+        if since_ms:
+            previous_start = start if now >= end else start - 3600
+            previous_end = previous_start + spawn.duration
+            if since_ms / 1000.0 < previous_end <= now:
+                map_cell.deleted_objects.append(str(self._appearance(spawn, previous_start)[0]))
+
+        if now >= end:
+            return
+
+        dist = distance(latitude, longitude, spawn.latitude, spawn.longitude)
+        if dist > self._nearby_radius:
+            return
+
+        encounter_id, pokemon_id = self._appearance(spawn, start)
+        start_ms = int(start * 1000)
+
+        nearby = map_cell.nearby_pokemons.add()
+        nearby.pokemon_id = pokemon_id
+        nearby.distance_in_meters = dist
+        nearby.encounter_id = encounter_id
+
+        if dist > self._visible_radius or start_ms <= since_ms:
+            return
+
+        time_till_hidden_ms = int((end - now) * 1000)
+
+        wild = map_cell.wild_pokemons.add()
+        wild.encounter_id = encounter_id
+        wild.last_modified_timestamp_ms = start_ms
+        wild.latitude = spawn.latitude
+        wild.longitude = spawn.longitude
+        wild.spawnpoint_id = spawn.id
+        wild.pokemon_data.pokemon_id = pokemon_id
+        wild.time_till_hidden_ms = time_till_hidden_ms
+
+        catchable = map_cell.catchable_pokemons.add()
+        catchable.spawnpoint_id = spawn.id
+        catchable.encounter_id = encounter_id
+        catchable.pokemon_id = pokemon_id
+        catchable.expiration_timestamp_ms = int(end * 1000)
+        catchable.latitude = spawn.latitude
+        catchable.longitude = spawn.longitude
+
+    def _appearance(self, spawn, start):
+        rnd = random.Random('{}:{}:{}'.format(self._seed, spawn.id, int(start)))
+        encounter_id = rnd.getrandbits(64)
+        if rnd.random() < 0.7:
+            pokemon_id = rnd.choice(COMMON_POKEMON)
+        else:
+            pokemon_id = rnd.randint(1, 151)
+        return encounter_id, pokemon_id
+
+    def _generate_cell(self, cell_id):
+        rnd = random.Random('{}:{}'.format(self._seed, cell_id))
+        cell = Cell(CellId(cell_id))
+        bound = cell.get_rect_bound()
+        lat_lo, lat_hi = bound.lat_lo().degrees, bound.lat_hi().degrees
+        lng_lo, lng_hi = bound.lng_lo().degrees, bound.lng_hi().degrees
+
+        def random_point():
+            while True:
+                lat, lng = rnd.uniform(lat_lo, lat_hi), rnd.uniform(lng_lo, lng_hi)
+                if cell.contains(CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).to_point()):
+                    return lat, lng
+
+        # densities are clustered - some cells are busy city blocks, others are empty
+        density = rnd.lognormvariate(0, 0.75)
+
+        forts = []
+        for i in range(_poisson(rnd, self._forts_per_cell * density)):
+            fort = _Fort()
+            fort.id = '{:032x}.16'.format(rnd.getrandbits(128))
+            fort.latitude, fort.longitude = random_point()
+            fort.type = 0 if rnd.random() < self._gym_ratio else 1
+            fort.last_modified_ms = 1467331200000 + rnd.randint(0, 10 ** 9)
+            forts.append(fort)
+
+        spawns = []
+        for i in range(_poisson(rnd, self._spawns_per_cell * density)):
+            spawn = _Spawn()
+            spawn.latitude, spawn.longitude = random_point()
+            spawn.id = spawnpoint_id(spawn.latitude, spawn.longitude)
+            spawn.second = rnd.randrange(3600)
+            spawn.duration = rnd.choice((self._spawn_duration,) * 8 + (1800, 3600))
+            spawns.append(spawn)
+
+        return forts, spawns
+
+
+def _poisson(rnd, lam):
+    # Knuth - the lambdas per cell are small
+    limit = math.exp(-lam)
+    k, p = 0, rnd.random()
+    while p > limit:
+        k += 1
+        p *= rnd.random()
+    return k
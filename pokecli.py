@@ -46,7 +46,6 @@ from pgoapi import utilities as util
 # other stuff
 from google.protobuf.internal import encoder
 from geopy.geocoders import GoogleV3
-from s2sphere import Cell, CellId, LatLng
 
 
 log = logging.getLogger(__name__)
@@ -61,22 +60,6 @@ def get_pos_by_name(location_name):
 
     return (loc.latitude, loc.longitude, loc.altitude)
 
-def get_cell_ids(lat, long, radius = 10):
-    origin = CellId.from_lat_lng(LatLng.from_degrees(lat, long)).parent(15)
-    walk = [origin.id()]
-    right = origin.next()
-    left = origin.prev()
-
-    # Search around provided radius
-    for i in range(radius):
-        walk.append(right.id())
-        walk.append(left.id())
-        right = right.next()
-        left = left.prev()
-
-    # Return everything
-    return sorted(walk)
-
 def encode(cellid):
     output = []
     encoder._VarintEncoder()(output.append, cellid)
@@ -170,7 +153,8 @@ def main():
     # get map objects call
     # repeated fields (e.g. cell_id and since_timestamp_ms in get_map_objects) can be provided over a list
     # ----------------------
-    #cell_ids = get_cell_ids(position[0], position[1])
+    #from pgoapi.cells import get_cell_ids
+    #cell_ids = get_cell_ids(position[0], position[1], radius=200)    # cells within 200m
     #timestamps = [0,] * len(cell_ids)
     #api.get_map_objects(latitude = util.f2i(position[0]), longitude = util.f2i(position[1]), since_timestamp_ms = timestamps, cell_id = cell_ids)
 
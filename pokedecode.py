@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import logging
+import argparse
+import multiprocessing
+
+# add directory of this file to PATH, so that the package will be found
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from pgoapi.rpc_api import RpcApi
+from pgoapi.capture import CaptureFile, CAPTURE_MAGIC
+from pgoapi.protobuf_to_dict import protobuf_to_dict
+
+from google.protobuf.message import DecodeError
+
+from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope, ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+log = logging.getLogger(__name__)
+
+# one RpcApi per worker process, only used for the RequestType -> class mapping
+rpc = RpcApi(None)
+
+def init_config():
+    parser = argparse.ArgumentParser(description='Decode captured or raw RPC envelopes into NDJSON')
+    parser.add_argument("inputs", nargs='+', help="Capture files, raw envelope files or directories of them")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=multiprocessing.cpu_count(), help="Number of worker processes")
+    parser.add_argument("-c", "--chunk-size", type=int, default=500, help="Envelopes per work unit")
+    parser.add_argument("-r", "--requests", help="Also decode the request envelopes", action='store_true')
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    return parser.parse_args()
+
+def find_units(inputs, chunk_size):
+    raw_files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                raw_files.extend(os.path.join(root, name) for name in sorted(files) if not name.endswith('.idx'))
+        else:
+            raw_files.append(path)
+
+    units = []
+    raw_chunk = []
+    for path in raw_files:
+        if is_capture(path):
+            with CaptureFile(path) as capture:
+                count = len(capture)
+            for start in range(0, count, chunk_size):
+                units.append(('capture', path, start, min(start + chunk_size, count)))
+        elif not path.endswith('.request'):
+            raw_chunk.append(path)
+            if len(raw_chunk) >= chunk_size:
+                units.append(('raw', raw_chunk))
+                raw_chunk = []
+
+    if raw_chunk:
+        units.append(('raw', raw_chunk))
+    return units
+
+def is_capture(path):
+    with open(path, 'rb') as f:
+        return f.read(len(CAPTURE_MAGIC)) == CAPTURE_MAGIC
+
+def decode_unit(unit):
+    lines = []
+    if unit[0] == 'capture':
+        _, path, start, end = unit
+        with CaptureFile(path) as capture:
+            for n in range(start, end):
+                record = capture[n]
+                entry = safe_decode(record.request_types, record.request if decode_requests else None, record.response)
+                entry.update({'source': path, 'index': n, 'timestamp': record.timestamp, 'latency': record.latency, 'http_status': record.status_code})
+                lines.append(json.dumps(entry, default=json_default))
+                del record
+    else:
+        for path in unit[1]:
+            # a raw response envelope can be accompanied by the request envelope in <name>.request
+            request = None
+            request_path = os.path.splitext(path)[0] + '.request'
+            if os.path.exists(request_path):
+                with open(request_path, 'rb') as f:
+                    request = f.read()
+            with open(path, 'rb') as f:
+                response = f.read()
+
+            request_types = []
+            if request is not None:
+                try:
+                    request_types = [r.request_type for r in parse(RequestEnvelope, request).requests]
+                except DecodeError as e:
+                    log.warning('Could not parse %s: %s', request_path, e)
+            entry = safe_decode(request_types, request if decode_requests else None, response)
+            entry['source'] = path
+            lines.append(json.dumps(entry, default=json_default))
+
+    return lines
+
+def safe_decode(request_types, request, response):
+    try:
+        return decode_envelopes(request_types, request, response)
+    except DecodeError as e:
+        return {'request_types': [RequestType.Name(t) for t in request_types], 'error': str(e)}
+
+def decode_envelopes(request_types, request, response):
+    entry = {'request_types': [RequestType.Name(t) for t in request_types]}
+
+    if request is not None:
+        envelope = parse(RequestEnvelope, request)
+        entry['request'] = protobuf_to_dict(envelope)
+        entry['request']['requests'] = [decode_message(rpc.get_request_classname, r.request_type, r.request_message)
+                                        for r in envelope.requests]
+
+    envelope = parse(ResponseEnvelope, response)
+    entry['response'] = protobuf_to_dict(envelope)
+    entry['response'].pop('returns', None)
+    entry['responses'] = {}
+    for request_type, subresponse in zip(request_types, envelope.returns):
+        entry['responses'][RequestType.Name(request_type)] = decode_message(rpc.get_response_classname, request_type, subresponse)
+    if len(envelope.returns) > len(request_types):
+        entry['undecoded_returns'] = [base64.b64encode(r) for r in envelope.returns[len(request_types):]]
+
+    return entry
+
+def decode_message(get_classname, request_type, data):
+    try:
+        message = parse(rpc.get_class(get_classname(request_type)), data)
+    except Exception as e:
+        return {'error': str(e), 'raw': base64.b64encode(bytes(data))}
+    return protobuf_to_dict(message)
+
+def parse(cls, data):
+    message = cls()
+    message.ParseFromString(data)
+    return message
+
+def json_default(value):
+    if isinstance(value, bytes):
+        return value.decode('ascii')
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+def init_worker(requests):
+    global decode_requests
+    decode_requests = requests
+
+decode_requests = False
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    units = find_units(config.inputs, config.chunk_size)
+    log.info('Decoding %s work units with %s processes', len(units), config.jobs)
+
+    output = open(config.output, 'w') if config.output else sys.stdout
+    started = time.time()
+    decoded = 0
+
+    pool = multiprocessing.Pool(config.jobs, init_worker, (config.requests,))
+    try:
+        for lines in pool.imap(decode_unit, units):
+            for line in lines:
+                output.write(line)
+                output.write('\n')
+            decoded += len(lines)
+    finally:
+        pool.close()
+        pool.join()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.time() - started
+    log.info('Decoded %s envelopes in %.2fs (%.0f envelopes/s)', decoded, elapsed, decoded / elapsed if elapsed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pgoapi.capture import CaptureWriter, CaptureFile, index_path, read_capture, replay
+
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+
+class CaptureFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'traffic.pgocap')
+        with CaptureWriter(self.path) as writer:
+            for i in range(10):
+                writer.write([2, 4], b'request' + str(i).encode(), 200, b'response' + str(i).encode(), timestamp=1000.0 + i)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_random_access(self):
+        with CaptureFile(self.path) as capture:
+            self.assertEqual(len(capture), 10)
+            record = capture[3]
+            self.assertEqual(record.request_types, [2, 4])
+            self.assertEqual(bytes(record.request), b'request3')
+            self.assertEqual(bytes(capture[-1].response), b'response9')
+            self.assertEqual([bytes(r.response) for r in capture.between(1002.0, 1004.0)], [b'response2', b'response3'])
+
+    def test_missing_index(self):
+        os.remove(index_path(self.path))
+        with CaptureFile(self.path) as capture:
+            self.assertEqual(len(capture), 10)
+            self.assertEqual([bytes(r.response) for r in capture], [bytes(r.response) for r in read_capture(self.path)])
+
+    def test_not_a_capture(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'garbage!')
+        self.assertRaises(ValueError, CaptureFile, self.path)
+
+    def test_replay_non_200(self):
+        envelope = ResponseEnvelope()
+        envelope.status_code = 1
+        envelope.returns.append(b'')
+        path = os.path.join(self.directory, 'replay.pgocap')
+        with CaptureWriter(path) as writer:
+            writer.write([RequestType.Value('GET_PLAYER')], b'', 200, envelope.SerializeToString())
+            writer.write([RequestType.Value('GET_PLAYER')], b'', 500, b'Internal \xff error')
+
+        with CaptureFile(path) as capture:
+            responses = [response for record, response in replay(capture)]
+        self.assertEqual(responses[0]['status_code'], 1)
+        self.assertIn('GET_PLAYER', responses[0]['responses'])
+        self.assertEqual(responses[1], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import threading
+import unittest
+
+from pgoapi import PGoApi
+from pgoapi.dispatcher import RequestDispatcher
+
+
+class BlockingApi(PGoApi):
+
+    """Answers every call once it is released."""
+
+    def __init__(self):
+        PGoApi.__init__(self)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def _call(self, req_method_list, player_position):
+        self.entered.set()
+        self.release.wait()
+        return {'status_code': 1}
+
+
+class RequestDispatcherTest(unittest.TestCase):
+
+    def test_stop_fails_queued_batches(self):
+        api = BlockingApi()
+        dispatcher = RequestDispatcher(api)
+        running = dispatcher.submit(api.batch().get_player())
+        self.assertTrue(api.entered.wait(5))
+        queued = [dispatcher.submit(api.batch().get_inventory()) for i in range(2)]
+
+        timer = threading.Timer(0.1, api.release.set)
+        timer.start()
+        dispatcher.stop()
+
+        self.assertEqual(running.result(5), {'status_code': 1})
+        for future in queued:
+            self.assertRaises(RuntimeError, future.result, 5)
+        self.assertEqual(dispatcher.queue_size(), 0)
+
+    def test_submit_after_stop(self):
+        api = BlockingApi()
+        api.release.set()
+        dispatcher = RequestDispatcher(api)
+        self.assertEqual(dispatcher.submit(api.batch().get_player()).result(5), {'status_code': 1})
+        dispatcher.stop()
+        self.assertRaises(RuntimeError, dispatcher.submit, api.batch().get_player())
+        self.assertRaises(RuntimeError, dispatcher.start)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import unittest
+
+from pgoapi.limiter import AdaptiveLimiter
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def test_idle_limit_does_not_grow(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        for i in range(100):
+            limiter.release(limiter.acquire(), 'ok', 0.01)
+        self.assertEqual(limiter.get_limit(), 4)
+        self.assertEqual(limiter.get_metrics()['increases'], 0)
+
+    def test_saturated_limit_grows(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        for i in range(10):
+            started = [limiter.acquire(), limiter.acquire()]
+            for s in started:
+                limiter.release(s, 'ok', 0.01)
+        self.assertGreater(limiter.get_limit(), 2)
+
+    def test_failure_decreases(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        limiter.release(limiter.acquire(), 'busy')
+        self.assertEqual(limiter.get_limit(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
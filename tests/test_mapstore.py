@@ -0,0 +1,86 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import unittest
+
+from pgoapi.cells import get_cell_ids
+from pgoapi.mapstore import MapStore
+
+NOW_MS = 1500000000000
+
+
+def map_cell(cell_id, wild=(), nearby=(), deleted=(), now_ms=NOW_MS):
+    return {'s2_cell_id': cell_id, 'current_timestamp_ms': now_ms, 'wild_pokemons': list(wild),
+            'nearby_pokemons': list(nearby), 'deleted_objects': list(deleted)}
+
+
+def wild(encounter_id, lat, lng, time_till_hidden_ms=0):
+    return {'encounter_id': encounter_id, 'spawnpoint_id': '0d42287e167', 'latitude': lat, 'longitude': lng,
+            'time_till_hidden_ms': time_till_hidden_ms, 'pokemon_data': {'pokemon_id': 16}}
+
+
+class MapStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = MapStore(clock=lambda: NOW_MS / 1000.0)
+        self.first, self.second = get_cell_ids(40.7128, -74.0060, 1000)[:2]
+
+    def test_record_moves_between_cells(self):
+        self.store.apply_cell(map_cell(self.first, wild=[wild(1, 40.7128, -74.0060)], nearby=[{'encounter_id': 2}]))
+        self.store.apply_cell(map_cell(self.second, wild=[wild(1, 40.7129, -74.0061)], nearby=[{'encounter_id': 2}]))
+
+        self.assertEqual(self.store.in_cell(self.first), [])
+        self.assertEqual([p.encounter_id for p in self.store.in_cell(self.second)], [1])
+        self.assertEqual(self.store.in_cell(self.first, 'nearby_pokemons'), [])
+
+        self.store.delete(1)
+        self.assertEqual(self.store.query_radius(40.7128, -74.0060, 2000), [])
+        self.assertEqual(self.store.in_cell(self.second), [])
+
+    def test_unknown_despawn_time_expires(self):
+        self.store.apply_cell(map_cell(self.first, wild=[wild(1, 40.7128, -74.0060), wild(2, 40.7128, -74.0060, 60000)]))
+
+        self.assertEqual(self.store.pokemons[1].expires_ms, NOW_MS + 900 * 1000)
+        self.assertEqual(self.store.expire(NOW_MS / 1000.0 + 61), 1)
+        self.assertEqual(list(self.store.pokemons), [1])
+        self.assertEqual(self.store.expire(NOW_MS / 1000.0 + 901), 1)
+        self.assertEqual(len(self.store), 0)
+
+    def test_ingest_skips_failed_responses(self):
+        cell = map_cell(self.first, wild=[wild(1, 40.7128, -74.0060)])
+        self.assertEqual(self.store.ingest({'responses': {'GET_MAP_OBJECTS': 'Protobuf definition seems not to match'}}), 0)
+        self.assertEqual(self.store.ingest({'responses': {'GET_MAP_OBJECTS': {'status': 3, 'map_cells': [cell]}}}), 0)
+        self.assertEqual(self.store.ingest({'responses': {}}), 0)
+        self.assertEqual(len(self.store), 0)
+
+        self.assertEqual(self.store.ingest({'responses': {'GET_MAP_OBJECTS': {'status': 1, 'map_cells': [cell]}}}), 1)
+        self.assertEqual(list(self.store.pokemons), [1])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
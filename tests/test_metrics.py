@@ -0,0 +1,94 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import unittest
+
+import requests
+
+from pgoapi.exceptions import ServerBusyOrOfflineException
+from pgoapi.metrics import MetricsRegistry
+from pgoapi.rpc_api import RpcApi
+
+from test_rpc_api import ENTRY, GET_PLAYER, Session, envelope, rpc_api
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_rpc_metrics(self):
+        metrics = MetricsRegistry()
+        RpcApi.describe_metrics(metrics)
+        session = Session(envelope(1, returns=1), envelope(1, returns=1))
+        for i in range(2):
+            rpc_api(session, metrics=metrics).request(ENTRY, [GET_PLAYER], None)
+
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_total', (('outcome', 'ok'),)), 2)
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_subrequests_total', (('request_type', 'GET_PLAYER'),)), 2)
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_status_total', (('status_code', 1),)), 2)
+        histograms = metrics.to_dict()['histograms']
+        self.assertEqual([h['count'] for h in histograms['pgoapi_rpc_subrequests']], [2])
+        self.assertIn('pgoapi_rpc_total{outcome="ok"} 2', metrics.to_prometheus())
+
+    def test_failed_replay_is_not_ok(self):
+        metrics = MetricsRegistry()
+        session = Session(envelope(53, 'pgorelease.nianticlabs.com/plfe/456', ticket=True), requests.exceptions.ConnectionError())
+        rpc = rpc_api(session, ticket=True, metrics=metrics)
+        self.assertRaises(ServerBusyOrOfflineException, rpc.request, ENTRY, [GET_PLAYER], None)
+
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_total', (('outcome', 'ok'),)), 0)
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_total', (('outcome', 'busy'),)), 1)
+
+    def test_replay_is_measured(self):
+        metrics = MetricsRegistry()
+        first, replayed = envelope(53, 'pgorelease.nianticlabs.com/plfe/456', ticket=True), envelope(1, returns=1)
+        rpc = rpc_api(Session(first, replayed), ticket=True, metrics=metrics)
+        rpc.request(ENTRY, [GET_PLAYER], None)
+
+        histograms = metrics.to_dict()['histograms']
+        self.assertEqual(histograms['pgoapi_rpc_response_bytes'][0]['sum'], len(first.content) + len(replayed.content))
+        self.assertEqual(histograms['pgoapi_rpc_response_bytes'][0]['count'], 1)
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_total', (('outcome', 'ok'),)), 1)
+        self.assertEqual(metrics.get_counter('pgoapi_rpc_status_total', (('status_code', 1),)), 1)
+
+    def test_reset_keeps_cached_objects(self):
+        metrics = MetricsRegistry()
+        counter = metrics.counter('requests')
+        histogram = metrics.histogram('latency')
+        metrics.inc('requests')
+        metrics.observe('latency', 0.2)
+        metrics.reset()
+
+        self.assertEqual(metrics.get_counter('requests'), 0)
+        self.assertEqual(histogram.count, 0)
+        with metrics.lock:
+            counter.value += 1
+            histogram.observe(0.2)
+        self.assertEqual(metrics.get_counter('requests'), 1)
+        self.assertEqual(metrics.to_dict()['histograms']['latency'][0]['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import unittest
+
+from pgoapi import PGoApi
+from pgoapi.world import SyntheticWorld
+from pgoapi.standin import StandInServer, StandInAuth
+
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+
+
+def error_status(request_bytes):
+    response = ResponseEnvelope()
+    response.status_code = 3
+    return 200, response.SerializeToString()
+
+
+class LoginTest(unittest.TestCase):
+
+    def login(self, handler):
+        server = StandInServer(handler)
+        server.start()
+        try:
+            api = PGoApi()
+            api.set_api_endpoint(server.url)
+            return api.login(StandInAuth(), 'user', 'password')
+        finally:
+            server.stop()
+
+    def test_login_on_known_endpoint(self):
+        self.assertTrue(self.login(SyntheticWorld(seed=1).handle))
+
+    def test_login_fails_on_error_status(self):
+        self.assertFalse(self.login(error_status))
+
+
+class HookTest(unittest.TestCase):
+
+    def test_remove_last_hook(self):
+        api = PGoApi()
+        callback = lambda context: None
+        api.add_hook('before_send', callback)
+        api.remove_hook('before_send', callback)
+        self.assertEqual(api._hooks, {})
+
+    def test_unknown_hook(self):
+        api = PGoApi()
+        callback = lambda context: None
+        self.assertRaises(ValueError, api.add_hook, 'before_lunch', callback)
+        self.assertRaises(ValueError, api.remove_hook, 'before_lunch', callback)
+        self.assertRaises(ValueError, api.remove_hook, 'before_send', callback)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import unittest
+
+import requests
+
+from pgoapi.rpc_api import RpcApi
+from pgoapi.limiter import AdaptiveLimiter
+from pgoapi.standin import StandInAuth
+from pgoapi.exceptions import ServerBusyOrOfflineException
+
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+ENTRY = 'https://pgorelease.nianticlabs.com/plfe/rpc'
+GET_PLAYER = RequestType.Value('GET_PLAYER')
+
+
+class Response:
+
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+
+
+class Session:
+
+    """Answers the posts of an RpcApi with prepared responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.posts = []
+
+    def post(self, endpoint, data=None, **kwargs):
+        self.posts.append((endpoint, kwargs))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def envelope(status_code=1, api_url=None, ticket=False, returns=0):
+    response = ResponseEnvelope()
+    response.status_code = status_code
+    response.request_id = 8145806132888207460
+    if api_url:
+        response.api_url = api_url
+    if ticket:
+        response.auth_ticket.expire_timestamp_ms = 1
+        response.auth_ticket.start = b'start'
+        response.auth_ticket.end = b'end'
+    response.returns.extend([b''] * returns)
+    return Response(response.SerializeToString())
+
+
+def rpc_api(session, ticket=False, **kwargs):
+    auth = StandInAuth()
+    auth.login('user', 'password')
+    if ticket:
+        auth.set_ticket((1, b'start', b'end'))
+    rpc = RpcApi(auth, **kwargs)
+    rpc._session = session
+    return rpc
+
+
+class EndpointTest(unittest.TestCase):
+
+    def test_login_is_not_replayed(self):
+        session = Session(envelope(53, 'pgorelease.nianticlabs.com/plfe/123', ticket=True))
+        rpc = rpc_api(session)
+        response = rpc.request(ENTRY, [GET_PLAYER], None)
+        self.assertEqual(len(session.posts), 1)
+        self.assertEqual(response['api_url'], 'pgorelease.nianticlabs.com/plfe/123')
+        self.assertIn('auth_ticket', response)
+        self.assertEqual(rpc.get_api_endpoint(), None)
+
+    def test_redirect_is_replayed(self):
+        session = Session(envelope(53, 'pgorelease.nianticlabs.com/plfe/456', ticket=True), envelope(1, returns=1))
+        rpc = rpc_api(session, ticket=True)
+        response = rpc.request('https://pgorelease.nianticlabs.com/plfe/123/rpc', [GET_PLAYER], None)
+        self.assertEqual([endpoint for endpoint, _ in session.posts],
+                         ['https://pgorelease.nianticlabs.com/plfe/123/rpc', 'https://pgorelease.nianticlabs.com/plfe/456/rpc'])
+        self.assertEqual(rpc.get_api_endpoint(), 'https://pgorelease.nianticlabs.com/plfe/456/rpc')
+        self.assertEqual(response['status_code'], 1)
+        self.assertIn('GET_PLAYER', response['responses'])
+        self.assertIn('auth_ticket', response)
+
+
+class TimeoutTest(unittest.TestCase):
+
+    def test_timeout_is_passed_to_the_session(self):
+        session = Session(envelope(1, returns=1))
+        rpc_api(session, timeout=7.5).request(ENTRY, [GET_PLAYER], None)
+        self.assertEqual(session.posts[0][1]['timeout'], 7.5)
+
+    def test_timeout_decreases_the_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        session = Session(requests.exceptions.Timeout())
+        rpc = rpc_api(session, limiter=limiter, timeout=1)
+        self.assertRaises(ServerBusyOrOfflineException, rpc.request, ENTRY, [GET_PLAYER], None)
+
+        metrics = limiter.get_metrics()
+        self.assertEqual(metrics['outcomes'], {'timeout': 1})
+        self.assertEqual(metrics['decreases'], 1)
+        self.assertEqual(metrics['limit'], 4)
+        self.assertEqual(metrics['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import threading
+import unittest
+
+from pgoapi.scheduler import SpawnScheduler
+from pgoapi.spawndb import Spawn
+
+# start of an hour
+NOW = 3600 * 400000
+
+
+def spawn(spawn_id, latitude, despawn_second, duration=900):
+    spawn = Spawn()
+    spawn.id, spawn.latitude, spawn.longitude = spawn_id, latitude, -3.7038
+    spawn.despawn_second, spawn.max_time_till_hidden = despawn_second, duration
+    return spawn
+
+
+class FakeBatch:
+
+    def __init__(self, api, lat, lng):
+        self.api = api
+        self.position = (lat, lng, 0)
+
+    def get_position(self):
+        return self.position
+
+    def get_map_objects(self, **kwargs):
+        self.api.requests.append((self.position, kwargs))
+
+    def execute(self):
+        return {'responses': {'GET_MAP_OBJECTS': {'status': 1, 'map_cells': []}}}
+
+
+class FakeApi:
+
+    def __init__(self):
+        self.requests = []
+
+    def batch(self, lat, lng, alt):
+        return FakeBatch(self, lat, lng)
+
+
+class SpawnSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        # visible since 400s before now, appears in 100s and appears in 1100s; the spawns are 1km apart
+        self.spawns = [spawn('visible', 40.40, 500), spawn('soon', 40.41, 1000), spawn('later', 40.42, 2000)]
+        self.scheduler = SpawnScheduler(self.spawns, clock=lambda: NOW)
+
+    def test_due_order_and_hourly_reschedule(self):
+        jobs = self.scheduler.jobs()
+        self.assertEqual([job.spawns[0].id for job in jobs], ['visible', 'soon', 'later'])
+        self.assertEqual([job.time - NOW for job in jobs], [-390, 110, 1110])
+        self.assertEqual([job.deadline - NOW for job in jobs], [470, 970, 1970])
+
+        self.assertEqual([job.spawns[0].id for job in self.scheduler.due(NOW)], ['visible'])
+        self.assertEqual(self.scheduler.due(NOW + 100), [])
+        self.assertEqual([job.spawns[0].id for job in self.scheduler.due(NOW + 110)], ['soon'])
+        self.assertEqual(self.scheduler.next_time(), NOW + 1110)
+
+        # too late for the pokemon of 'later', its job is skipped
+        self.assertEqual(self.scheduler.due(NOW + 2000), [])
+        self.assertEqual(self.scheduler.missed, 1)
+
+        # every job repeats an hour later
+        self.assertEqual(len(self.scheduler), 3)
+        self.assertEqual([job.time - NOW for job in self.scheduler.jobs()], [3210, 3710, 4710])
+        self.assertEqual([job.spawns[0].id for job in self.scheduler.due(NOW + 3710)], ['visible', 'soon'])
+
+    def test_start_stop(self):
+        scanned = []
+        done = threading.Event()
+
+        def callback(job, response):
+            scanned.append((job.spawns[0].id, response['responses']['GET_MAP_OBJECTS']['status']))
+            if len(scanned) == 2:
+                done.set()
+
+        scheduler = SpawnScheduler(self.spawns, clock=lambda: NOW + 120)
+        apis = [FakeApi(), FakeApi()]
+        scheduler.start(apis, callback)
+        self.assertTrue(done.wait(10))
+        # the workers wait for 'later' until they are stopped
+        scheduler.stop()
+
+        self.assertEqual(sorted(scanned), [('soon', 1), ('visible', 1)])
+        self.assertEqual(scheduler.scans, 2)
+        self.assertEqual(scheduler.missed, 0)
+        self.assertEqual(scheduler.next_time(), NOW + 1110)
+        requests = [request for api in apis for request in api.requests]
+        self.assertEqual(sorted(position[0] for position, _ in requests), [40.40, 40.41])
+        for _, kwargs in requests:
+            self.assertTrue(kwargs['cell_id'])
+            self.assertEqual(kwargs['since_timestamp_ms'], [0] * len(kwargs['cell_id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
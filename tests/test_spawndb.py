@@ -0,0 +1,66 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import unittest
+
+from s2sphere import CellId, LatLng
+
+from pgoapi.cells import spawnpoint_id
+from pgoapi.spawndb import SpawnDatabase
+
+# Madrid lies on S2 face 0, so its cell tokens start with a zero
+MADRID = (40.416775, -3.703790)
+
+
+class SpawnDatabaseTest(unittest.TestCase):
+
+    def test_spawnpoint_id_keeps_leading_zeros(self):
+        token = CellId.from_lat_lng(LatLng.from_degrees(*MADRID)).parent(20).to_token()
+        self.assertEqual(len(token), 11)
+        self.assertTrue(token.startswith('0'))
+        self.assertEqual(spawnpoint_id(*MADRID), token)
+
+    def test_spawn_point_and_wild_pokemon_merge(self):
+        token = CellId.from_lat_lng(LatLng.from_degrees(*MADRID)).parent(20).to_token()
+        map_cell = {
+            's2_cell_id': CellId.from_lat_lng(LatLng.from_degrees(*MADRID)).parent(15).id(),
+            'current_timestamp_ms': 1000 * 3600 * 100 + 600 * 1000,
+            'spawn_points': [{'latitude': MADRID[0], 'longitude': MADRID[1]}],
+            'wild_pokemons': [{'spawnpoint_id': token, 'latitude': MADRID[0], 'longitude': MADRID[1],
+                               'time_till_hidden_ms': 1200 * 1000}],
+        }
+        with SpawnDatabase() as spawns:
+            spawns.ingest({'status': 1, 'map_cells': [map_cell]})
+            self.assertEqual(spawns.ingest({'status': 2, 'map_cells': [map_cell]}), 0)
+            self.assertEqual(spawns.count(), 1)
+            spawn = spawns.get(token)
+            self.assertEqual(spawn.despawn_second, 1800)
+            self.assertEqual(spawn.duration, 1800)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import unittest
+import multiprocessing
+
+from pgoapi.world import SyntheticWorld
+from pgoapi.standin import StandInServer, StandInAuth
+from pgoapi.workers import ScanRunner
+
+
+def slow_first_worker(api, lat, lng):
+    if multiprocessing.current_process().name == 'ScanRunner-worker-0':
+        time.sleep(0.05)
+    return {'position': (lat, lng)}
+
+
+class ScanRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInServer(SyntheticWorld(seed=1).handle)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_slow_worker_is_stolen_from(self):
+        positions = [(40.7 + i * 0.001, -74.0) for i in range(60)]
+        accounts = [(StandInAuth(), 'worker{}'.format(i), 'password') for i in range(2)]
+        runner = ScanRunner(accounts, processes=2, chunk_size=2, api_endpoint=self.server.url, scan=slow_first_worker)
+
+        scanned = []
+        self.assertEqual(runner.run(positions, callback=lambda position, response: scanned.append(tuple(position))), 60)
+
+        self.assertEqual(sorted(scanned), sorted(positions))
+        self.assertEqual(runner.stats['errors'], 0)
+        self.assertGreaterEqual(runner.stats['steals'], 1)
+        self.assertGreater(runner.stats['per_worker'][1], runner.stats['per_worker'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()